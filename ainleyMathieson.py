@@ -0,0 +1,164 @@
+#
+# =============================================================================
+#          VECTORIZED AINLEY-MATHIESON TURBINE LOSS MODEL
+#                      (PORT OF AM_LossModel.calculate IN
+#                       elements/OTACLossModel_AinleyMathieson1951.int)
+#
+# =============================================================================
+
+
+import os
+
+import numpy
+
+from npssTables import loadTables
+
+c_DEGtoRAD = numpy.pi/180.
+
+
+
+# tables of graphs from Ainley & Mathieson, read from the interpreted element
+elementFile = os.path.join( os.path.dirname( os.path.abspath( __file__ ) ),
+                            "elements", "OTACLossModel_AinleyMathieson1951.int" )
+tables = loadTables( elementFile )
+
+
+
+def blendMN( subsonic, sonic, MN ):
+   '''exit angle for the exit Mach number, linear between MN 0.5 and 1'''
+
+   return numpy.where( MN <= 0.5, subsonic,
+          numpy.where( MN > 1.0, sonic, 2.*( sonic - subsonic )*MN + 2.*subsonic - sonic ) )
+
+
+
+
+def lossAM( opening, pitch, pitchToChord, bladeRc, thicknessToChord, TEthicknessToPitch,
+            bladeInletAngle, incidence, betaIn, MNrelOut, areaIn, areaOut, radiusOuterOut,
+            radiusHubExit, radiusTipExit, tipClearance, tipClearanceToBladeHeight,
+            rotating=True, shroudSeal=False, X=1.35 ):
+   '''evaluates the Ainley-Mathieson loss model over arrays of blade segments
+
+      opening, pitch             throat opening and blade pitch
+      pitchToChord               blade pitch/chord
+      bladeRc                    blade radius of curvature, same units as pitch
+      thicknessToChord           maximum thickness/chord
+      TEthicknessToPitch         trailing edge thickness/pitch
+      bladeInletAngle            inlet blade angle, rad
+      incidence                  incidence, rad
+      betaIn                     inlet relative flow angle (Fl_IR.beta), rad
+      MNrelOut                   exit relative Mach number (Fl_OR.MNrel)
+      areaIn, areaOut            inlet and exit flow areas (Fl_IR.area, Fl_OR.area)
+      radiusOuterOut             exit outer radius (Fl_OR.radiusOuter)
+      radiusHubExit, radiusTipExit   blade row exit hub and tip radii
+      tipClearance               tip clearance, same units as the radii
+      tipClearanceToBladeHeight  tip clearance/blade height
+      rotating                   True for rotors (switchRotate "ROTATING")
+      shroudSeal                 True for rows with a shroud seal
+      X                          outlet angle tip clearance factor, 1.35
+                                 normally and 0.70 for shrouded blades
+
+      the inputs broadcast against each other; returns a dictionary of arrays
+      named as the element variables (flowAngle, deviation, Yp, Ys, Yk, Yt,
+      ...), with lossReturned = Yt
+   '''
+
+   ( opening, pitch, pitchToChord, bladeRc, thicknessToChord, TEthicknessToPitch, bladeInletAngle,
+     incidence, betaIn, MNrelOut, areaIn, areaOut, radiusOuterOut, radiusHubExit, radiusTipExit,
+     tipClearance, tipClearanceToBladeHeight, X ) = [ numpy.asarray( value, dtype=float ) for value in
+      ( opening, pitch, pitchToChord, bladeRc, thicknessToChord, TEthicknessToPitch, bladeInletAngle,
+        incidence, betaIn, MNrelOut, areaIn, areaOut, radiusOuterOut, radiusHubExit, radiusTipExit,
+        tipClearance, tipClearanceToBladeHeight, X ) ]
+   rotating = numpy.asarray( rotating, dtype=bool )
+   shroudSeal = numpy.asarray( shroudSeal, dtype=bool )
+
+   with numpy.errstate( divide='ignore', invalid='ignore' ):
+
+      #----------------------------------------------------------------------
+      #                EXIT FLOW ANGLE AND DEVIATION
+      #----------------------------------------------------------------------
+      angle_oqs = numpy.arccos( opening / pitch )
+      Ak = 2.*numpy.pi*tipClearance * radiusOuterOut
+
+      # flow angle for blades with zero tip clearance
+      bladeAngle = angle_oqs
+      flowAngleStar = ( 15.2/13.1 )*bladeAngle - c_DEGtoRAD*11.97
+      flowAngleSubsonic = flowAngleStar + c_DEGtoRAD*4.*( pitch/bladeRc )
+      areaThroat1 = areaOut*numpy.cos( angle_oqs )
+      flowAngleSonic = angle_oqs
+
+      alpha2 = blendMN( flowAngleSubsonic, flowAngleSonic, MNrelOut )
+      beta1 = bladeInletAngle
+
+      # flow angle for blades with tip clearance
+      kqh = tipClearanceToBladeHeight
+      term2 = X*kqh*numpy.cos( beta1 )/numpy.cos( flowAngleSubsonic )
+      flowAngleSubsonicTC = numpy.arctan( ( 1. - term2 )*numpy.tan( flowAngleSubsonic )
+                                          - term2*numpy.tan( beta1 ) )
+      areaThroat2 = areaThroat1*( 1. - kqh ) + Ak
+      flowAngleSonicTC = numpy.arccos( areaThroat2 / areaOut )
+
+      flowAngle = blendMN( flowAngleSubsonicTC, flowAngleSonicTC, MNrelOut )
+      deviation = bladeAngle - flowAngle
+
+
+      #----------------------------------------------------------------------
+      #                         PROFILE LOSS
+      #----------------------------------------------------------------------
+      # validity for impulse-like blades restricted to t/c between 15-25%
+      TqC = numpy.clip( thicknessToChord, 0.15, 0.25 )
+
+      YpBetaEqZero = tables['TB_YpNozzle']( alpha2, pitchToChord )
+      YpBetaEqAlpha = tables['TB_YpImpulse']( alpha2, pitchToChord )
+
+      # profile loss at zero incidence
+      YpZeroInc = ( YpBetaEqZero + ( beta1/alpha2 )**2.*( YpBetaEqAlpha - YpBetaEqZero ) ) \
+                * ( TqC/0.20 )**( beta1/alpha2 )
+
+      # stalling incidence, table is alpha/alphaRef
+      alphaRef = alpha2 / tables['TB_alphaRatio']( pitchToChord )
+      iStallRef = tables['TB_iStallRef']( alphaRef, beta1/alphaRef )
+      iStallDelta = tables['TB_iStallDelta']( alpha2, pitchToChord )
+      iStall = iStallRef + iStallDelta
+
+      # limited as in the element, for stators at design incidence
+      Yp = numpy.minimum( YpZeroInc * tables['TB_YpRatio']( incidence/iStall ), 0.7 )
+
+
+      #----------------------------------------------------------------------
+      #                SECONDARY LOSS AND TIP CLEARANCE LOSS
+      #----------------------------------------------------------------------
+      alphaMean = numpy.arctan( 0.5*( numpy.tan( betaIn ) + numpy.tan( alpha2 ) ) )
+      liftCoeff = 2.*numpy.cos( alphaMean )*( -numpy.tan( betaIn ) + numpy.tan( alpha2 ) )
+      lossTerm = liftCoeff**2. * numpy.cos( alpha2 )**2. / numpy.cos( alphaMean )**3.
+
+      area1 = areaIn*numpy.cos( beta1 )
+      area2 = areaOut*numpy.cos( alpha2 )
+      argTerm = ( area2/area1 )**2. / ( 1. + radiusHubExit/radiusTipExit )
+      lambda_ = tables['TB_SecondaryLoss']( argTerm )
+      Ys = lambda_ * lossTerm
+
+      B = numpy.where( shroudSeal, 0.25, 0.50 )
+      Yk = B * kqh * lossTerm
+
+      # beyond the incidence limits rotors use the values from the paper
+      IqIs = incidence/iStall
+      Ys = numpy.where( rotating & ( IqIs < -1.5 ), 0.1178/2., numpy.where( rotating & ( IqIs > 1.0 ), 0.2186/2., Ys ) )
+      Yk = numpy.where( rotating & ( IqIs < -1.5 ), 0.1178/2., numpy.where( rotating & ( IqIs > 1.0 ), 0.2186/2., Yk ) )
+
+
+      #----------------------------------------------------------------------
+      #                     TOTAL LOSS CALCULATION
+      #----------------------------------------------------------------------
+      TEcorrection = tables['TB_LossCorrection']( TEthicknessToPitch )
+      Yt = ( Yp + Ys + Yk )*TEcorrection
+
+   return { 'angle_oqs': angle_oqs, 'bladeAngle': bladeAngle, 'flowAngleStar': flowAngleStar,
+            'flowAngleSubsonic': flowAngleSubsonic, 'flowAngleSonic': flowAngleSonic,
+            'flowAngleSubsonicTC': flowAngleSubsonicTC, 'flowAngleSonicTC': flowAngleSonicTC,
+            'alpha2': alpha2, 'beta1': beta1 + 0.*alpha2, 'flowAngle': flowAngle, 'deviation': deviation,
+            'YpBetaEqZero': YpBetaEqZero, 'YpBetaEqAlpha': YpBetaEqAlpha, 'YpZeroInc': YpZeroInc,
+            'alphaRef': alphaRef, 'iStallRef': iStallRef, 'iStallDelta': iStallDelta, 'iStall': iStall,
+            'alphaMean': alphaMean, 'liftCoeff': liftCoeff, 'lambda': lambda_, 'B': B + 0.*alpha2,
+            'profileLoss': Yp, 'secondaryLoss': Ys, 'tipClearanceLoss': Yk,
+            'Yp': Yp, 'Ys': Ys, 'Yk': Yk, 'TEcorrection': TEcorrection, 'Yt': Yt, 'lossReturned': Yt }
@@ -0,0 +1,856 @@
+#
+# =============================================================================
+#          VECTORIZED GEOMETRY ENGINE FOR TURBOMACHINERY CAMBER LINES
+#                      AND AIRFOIL SURFACES
+#
+# =============================================================================
+
+
+
+AseriesThk = [  # approximate thickness for 10% max/chord
+0.00000,
+0.01056,0.01402,0.01747,0.01971,0.02180,0.02376,0.02559,0.02731,0.02892,0.03043,
+0.03184,0.03317,0.03441,0.03558,0.03668,0.03771,0.03868,0.03960,0.04047,0.04129,
+0.04207,0.04280,0.04350,0.04415,0.04478,0.04537,0.04592,0.04645,0.04694,0.04740,
+0.04783,0.04823,0.04859,0.04891,0.04919,0.04944,0.04963,0.04979,0.04989,0.04999,
+0.05007,0.05010,0.05008,0.05001,0.04990,0.04973,0.04952,0.04927,0.04897,0.04863,
+0.04824,0.04782,0.04735,0.04685,0.04631,0.04573,0.04511,0.04447,0.04378,0.04307,
+0.04233,0.04155,0.04075,0.03991,0.03905,0.03817,0.03726,0.03632,0.03537,0.03439,
+0.03339,0.03237,0.03133,0.03027,0.02920,0.02812,0.02702,0.02590,0.02477,0.02364,
+0.02249,0.02133,0.02017,0.01900,0.01782,0.01664,0.01545,0.01427,0.01308,0.01189,
+0.01070,0.00951,0.00833,0.00714,0.00597,0.00480,0.00364,0.00248,0.00134,0.00000 ]
+
+BseriesThk = [   # approximate thickness NACA63-006
+0.00000,
+0.00600,0.00940,0.01136,0.01308,0.01461,0.01596,0.01716,0.01825,0.01923,0.02013,
+0.02095,0.02172,0.02244,0.02312,0.02376,0.02437,0.02495,0.02549,0.02601,0.02650,
+0.02696,0.02738,0.02777,0.02812,0.02844,0.02871,0.02895,0.02916,0.02932,0.02946,
+0.02957,0.02967,0.02976,0.02986,0.02997,0.03005,0.03006,0.03002,0.02994,0.02982,
+0.02967,0.02949,0.02928,0.02904,0.02877,0.02849,0.02818,0.02786,0.02752,0.02716,
+0.02679,0.02641,0.02602,0.02562,0.02521,0.02479,0.02437,0.02395,0.02352,0.02308,
+0.02265,0.02221,0.02177,0.02133,0.02089,0.02045,0.02000,0.01956,0.01913,0.01869,
+0.01825,0.01781,0.01738,0.01694,0.01651,0.01608,0.01565,0.01522,0.01479,0.01436,
+0.01393,0.01350,0.01307,0.01265,0.01222,0.01179,0.01136,0.01093,0.01049,0.01006,
+0.00962,0.00918,0.00874,0.00830,0.00786,0.00700,0.00600,0.00400,0.00200,0.00000 ]
+
+TseriesThk = [   # approximate thickness for an HPT rotor
+0.00000,
+0.05000,0.06489,0.07522,0.08338,0.09033,0.09663,0.10263,0.10862,0.11490,0.12039,
+0.12383,0.12721,0.13054,0.13377,0.13690,0.13991,0.14278,0.14549,0.14802,0.15037,
+0.15253,0.15448,0.15623,0.15778,0.15914,0.16030,0.16129,0.16212,0.16280,0.16335,
+0.16378,0.16411,0.16435,0.16451,0.16460,0.16463,0.16458,0.16447,0.16429,0.16402,
+0.16366,0.16320,0.16261,0.16189,0.16101,0.15997,0.15874,0.15733,0.15572,0.15391,
+0.15189,0.14968,0.14727,0.14469,0.14193,0.13902,0.13598,0.13281,0.12955,0.12621,
+0.12282,0.11938,0.11590,0.11242,0.10894,0.10546,0.10201,0.09859,0.09520,0.09186,
+0.08856,0.08532,0.08212,0.07898,0.07590,0.07287,0.06990,0.06698,0.06413,0.06133,
+0.05858,0.05588,0.05324,0.05065,0.04810,0.04561,0.04316,0.04076,0.03840,0.03608,
+0.03381,0.03157,0.02937,0.02721,0.02508,0.02299,0.02093,0.01890,0.01600,0.00000 ]
+
+
+import numpy
+
+c_DEGtoRAD = numpy.pi/180.
+
+class ThicknessSeries( object ):
+   '''thickness distribution tabulated against fractional chord
+
+      thickness   thickness at each station
+      x           fractional chord location of each station, equally spaced
+                  from 0 to 1 when omitted
+   '''
+
+   __slots__ = ( 'x', 'thickness', 'slope', 'uniform' )
+
+   def __init__( self, thickness, x=None ):
+
+      self.thickness = numpy.array( thickness, dtype=float )
+      if x is None:
+         x = numpy.linspace( 0., 1., len(self.thickness) )
+      self.x = numpy.array( x, dtype=float )
+
+      if len(self.x) != len(self.thickness) or len(self.x) < 2:
+         raise ValueError( "thickness series needs at least 2 stations, with one x per thickness" )
+      spacing = numpy.diff( self.x )
+      if numpy.any( spacing <= 0. ):
+         raise ValueError( "thickness series stations must be in increasing x" )
+
+      # the piecewise linear interpolant is stored as a slope per interval;
+      # equally spaced stations are located directly instead of searched
+      self.slope = numpy.diff( self.thickness )/spacing
+      self.uniform = numpy.allclose( spacing, spacing[0] )
+
+   def __call__( self, x ):
+      '''returns the thickness at fractional chord locations x, held constant
+         beyond the end stations'''
+
+      x = numpy.clip( x, self.x[0], self.x[-1] )
+      if self.uniform:
+         i = ( ( x - self.x[0] )*( ( len(self.x) - 1 )/( self.x[-1] - self.x[0] ) ) ).astype( numpy.intp )
+         i = numpy.minimum( i, len(self.x) - 2 )
+      else:
+         i = numpy.searchsorted( self.x, x, side='right' ) - 1
+         i = numpy.minimum( i, len(self.x) - 2 )
+
+      return self.thickness[i] + self.slope[i]*( x - self.x[i] )
+
+
+
+
+# thickness distributions by name; the built-in tables are defined at 101
+# stations, every 1% of chord
+thicknessSeries = {
+   "Aseries": ThicknessSeries( AseriesThk ),
+   "Bseries": ThicknessSeries( BseriesThk ),
+   "Tseries": ThicknessSeries( TseriesThk ),
+}
+
+
+
+def registerThickness( name, thickness, x=None ):
+   '''adds a thickness distribution to the registry, replacing any
+      distribution of the same name'''
+
+   thicknessSeries[name] = ThicknessSeries( thickness, x )
+   return thicknessSeries[name]
+
+
+
+def loadThickness( name, fname ):
+   '''adds a thickness distribution read from a text file to the registry
+
+      the file holds two columns, fractional chord and thickness, or a single
+      column of thickness at equally spaced stations; '#' starts a comment
+   '''
+
+   data = numpy.loadtxt( fname, ndmin=2 )
+   if data.shape[1] == 1:
+      return registerThickness( name, data[:,0] )
+   return registerThickness( name, data[:,1], data[:,0] )
+
+
+
+
+def getThickness( pctLocs, t, series ):
+   '''returns the thickness along each arc of a camber line
+
+      pctLocs   fractional chord locations where the arcs start and end,
+                (..., narcs+1)
+      t         fractional position of each point along its arc,
+                (..., narcs, npts)
+      series    name of the thickness distribution; a name that is not in
+                the registry gives zero thickness
+
+      the thickness is returned as a (..., narcs, npts) array
+   '''
+
+   pctLocs = numpy.asarray( pctLocs, dtype=float )
+
+   # fractional chord location of each point along each arc
+   x = pctLocs[...,:-1,None] + ( pctLocs[...,1:] - pctLocs[...,:-1] )[...,None]*t
+
+   distribution = thicknessSeries.get( series )
+   if distribution is None:
+      return numpy.zeros( x.shape )
+
+   return distribution( x )
+
+
+
+
+def circularArc( turningAngle, t ):
+   '''defines circular arcs to be used as parts of a camber line
+
+      turningAngle   turning angle of each arc in degrees, (..., narcs)
+      t              fractional position of each point along its arc,
+                     (..., narcs, npts)
+
+      the points are returned as (..., narcs, npts) arrays
+   '''
+
+   # each arc has a chord length of 1, turningAngle in degrees
+   # the arc starts at x=0, y=0 and ends at x=1, y=0
+   turningAngle = numpy.where( turningAngle == 0, 0.0000001, turningAngle )
+   turning = turningAngle[...,None]*c_DEGtoRAD
+   y0 = -0.5/numpy.tan( turning/2. )
+   radius = 0.5/numpy.sin( turning/2. )
+
+   # x,y points determined by their fraction of the arc
+   alpha = ( t - 0.5 )*turning
+   xArc = 0.5 + radius*numpy.sin( alpha )
+   yArc = y0 + radius*numpy.cos( alpha )
+
+   return xArc, yArc
+
+
+
+
+def MSR( xArc, yArc, scaleFactor, rotationAngle, xStart, yStart ):
+   '''move, scale, and rotate a chain of curves
+
+      xArc, yArc      points of each curve, (..., ncurves, npts)
+      scaleFactor     scale factor of each curve, (..., ncurves)
+      rotationAngle   rotation of each curve in degrees, (..., ncurves)
+      xStart, yStart  start of the first curve of each chain, (...)
+   '''
+
+   # each curve is scaled and rotated about its first point, then
+   # translated so it begins where the previous curve ended
+   rotation = numpy.asarray( rotationAngle )[...,None]*c_DEGtoRAD
+   scaleFactor = numpy.asarray( scaleFactor )[...,None]
+
+   dx = xArc - xArc[...,:1]
+   dy = yArc - yArc[...,:1]
+   cosRot = scaleFactor*numpy.cos( rotation )
+   sinRot = scaleFactor*numpy.sin( rotation )
+   xRot = dx*cosRot - dy*sinRot
+   yRot = dx*sinRot + dy*cosRot
+
+   # the origin of each curve is the end of the previous one
+   xOrigin = numpy.cumsum( xRot[...,-1], axis=-1 ) - xRot[...,-1]
+   yOrigin = numpy.cumsum( yRot[...,-1], axis=-1 ) - yRot[...,-1]
+   xOrigin += numpy.asarray( xStart )[...,None]
+   yOrigin += numpy.asarray( yStart )[...,None]
+
+   return xRot + xOrigin[...,None], yRot + yOrigin[...,None]
+
+
+
+
+def offsetSurfaces( xCL, yCL, angle, side, thick ):
+   '''offsets the upper and lower surfaces from camber line points
+
+      xCL, yCL   camber line points, (..., narcs, npts)
+      angle      angle of the camber line at each point in degrees,
+                 (..., narcs, npts)
+      side       1 where the suction surface is to the left of the camber
+                 line, -1 where it is to the right, (..., narcs)
+      thick      offset of the surfaces from the camber line, (..., narcs, npts)
+   '''
+
+   # note: 'upper' is suction surface, 'lower' is pressure surface
+   alpha = ( angle + 90. )*c_DEGtoRAD
+   dx = side[...,None]*thick*numpy.cos( alpha )
+   dy = side[...,None]*thick*numpy.sin( alpha )
+
+   return xCL + dx, yCL + dy, xCL - dx, yCL - dy
+
+
+
+
+def surface( xCL, yCL, angle1, turning, thick, t ):
+   '''creates upper and lower surfaces for a chain of circular camber line
+      arcs; the public, vectorized form of the original surface(), for
+      callers that have each arc's leading angle and turning rather than
+      the camber angle at every point (offsetSurfaces)
+
+      xCL, yCL   camber line points of each arc, (..., narcs, npts)
+      angle1     angle of the arc at its leading point in degrees, (..., narcs)
+      turning    turning angle of each arc in degrees, (..., narcs)
+      thick      offset of the surfaces from the camber line, (..., narcs, npts)
+      t          fractional position of each point along its arc,
+                 (..., narcs, npts)
+   '''
+
+   # the suction surface flips to the other side of negatively turning arcs
+   angle = angle1[...,None] - t*turning[...,None]
+   return offsetSurfaces( xCL, yCL, angle, numpy.where( turning < 0, -1., 1. ), thick )
+
+
+
+
+def chordLocations( relLengs ):
+   '''returns the fractional chord locations where a chain of arcs of
+      relative lengths relLengs (..., narcs) start and end, (..., narcs+1)'''
+
+   relLengs = numpy.asarray( relLengs, dtype=float )
+   zero = numpy.zeros( relLengs.shape[:-1] + ( 1, ) )
+   return numpy.concatenate( ( zero, numpy.cumsum( relLengs[...,:-1], axis=-1 ), zero + 1. ), axis=-1 )
+
+
+
+
+def rowInterp( x, xp, fp ):
+   '''interpolates each row of x (..., nx) in its own row of the increasing
+      table xp, fp; either of xp, fp may be a single row (np) shared by all'''
+
+   # offsetting every row past the end of the previous one makes the
+   # flattened rows a single increasing table
+   xp = numpy.broadcast_to( xp, x.shape[:-1] + numpy.shape( xp )[-1:] )
+   span = xp.max() - xp.min() + 1.
+   offset = span*numpy.arange( xp[...,0].size ).reshape( xp.shape[:-1] + ( 1, ) )
+   xFlat = ( numpy.clip( x, xp[...,:1], xp[...,-1:] ) + offset ).ravel()
+   xpFlat = ( xp + offset ).ravel()
+   fpFlat = numpy.broadcast_to( fp, xp.shape ).ravel()
+
+   return numpy.interp( xFlat, xpFlat, fpFlat ).reshape( x.shape )
+
+
+
+
+def pointDistribution( turns, relLengs, npts=101, clustering="uniform", maxTqC=0., thkProfile=None ):
+   '''returns the fractional position of each point along its arc of a
+      camber line, (..., narcs, npts)
+
+      turns          turning angle of each circular arc, (..., narcs) degrees
+      relLengs       relative length of each circular arc, (..., narcs)
+      npts           number of points on each arc
+      clustering     "uniform"   equally spaced along each arc
+                     "cosine"    cosine spaced along the whole camber line,
+                                 clustered at the leading and trailing edges
+                     "adaptive"  spaced by the turning of the camber line and
+                                 of the surfaces, clustered where they curve
+      maxTqC         scale factor on thickness-to-chord, for "adaptive"
+      thkProfile     thickness profile of the airfoil, for "adaptive"
+   '''
+
+   turns = numpy.asarray( turns, dtype=float )
+   relLengs = numpy.asarray( relLengs, dtype=float )
+   u = numpy.linspace( 0., 1., npts )
+
+   if clustering == "uniform":
+      return numpy.broadcast_to( u, relLengs.shape + ( npts, ) )
+
+   pctLocs = chordLocations( relLengs )
+
+   if clustering == "cosine":
+      # the arcs share the cosine spacing of the whole camber line
+      uLocs = numpy.arccos( 1. - 2.*numpy.clip( pctLocs, 0., 1. ) )/numpy.pi
+      uArc = uLocs[...,:-1,None] + ( uLocs[...,1:] - uLocs[...,:-1] )[...,None]*u
+      x = 0.5*( 1. - numpy.cos( numpy.pi*uArc ) )
+
+   elif clustering == "adaptive":
+      # equidistribute  1 + |turning rate of the camber line| + |turning
+      # rate of the surfaces|  along the chord, sampled on a fine grid
+      xFine = numpy.linspace( 0., 1., 1001 )
+      arc = numpy.sum( xFine >= pctLocs[...,1:-1,None], axis=-2 )
+      camberRate = numpy.abs( turns )*c_DEGtoRAD/numpy.maximum( relLengs, 1.e-6 )
+      monitor = 1. + numpy.take_along_axis( camberRate, arc, axis=-1 )
+
+      distribution = thicknessSeries.get( thkProfile )
+      if distribution is not None:
+         slope = numpy.gradient( maxTqC*distribution( xFine ), xFine, axis=-1 )
+         rate = numpy.abs( numpy.gradient( numpy.arctan( slope ), xFine, axis=-1 ) )
+
+         # spread the kinks of the tabulated thickness over 2% of chord
+         total = numpy.cumsum( rate, axis=-1 )
+         total = numpy.concatenate( ( numpy.zeros( total.shape[:-1] + ( 1, ) ), total ), axis=-1 )
+         lo = numpy.maximum( numpy.arange( len(xFine) ) - 10, 0 )
+         hi = numpy.minimum( numpy.arange( len(xFine) ) + 11, len(xFine) )
+         monitor = monitor + ( total[...,hi] - total[...,lo] )/( hi - lo )
+
+      weight = numpy.cumsum( 0.5*( monitor[...,1:] + monitor[...,:-1] ), axis=-1 )
+      weight = numpy.concatenate( ( numpy.zeros( weight.shape[:-1] + ( 1, ) ), weight ), axis=-1 )
+      weight = weight/weight[...,-1:]
+
+      wLocs = rowInterp( pctLocs, xFine, weight )
+      wArc = wLocs[...,:-1,None] + ( wLocs[...,1:] - wLocs[...,:-1] )[...,None]*u
+      x = rowInterp( wArc.reshape( wArc.shape[:-2] + ( -1, ) ), weight, xFine ).reshape( wArc.shape )
+
+   else:
+      raise ValueError( "unknown point clustering '%s'" % clustering )
+
+   # convert chord locations to fractions of each arc
+   length = ( pctLocs[...,1:] - pctLocs[...,:-1] )[...,None]
+   t = ( x - pctLocs[...,:-1,None] )/numpy.where( length > 0., length, 1. )
+   t = numpy.where( length > 0., t, u )
+   t[...,0] = 0.
+   t[...,-1] = 1.
+
+   return t
+
+
+
+
+def circularArcCamber( turns, relLengs, staggerAngle, chord, xStart, yStart, t ):
+   '''chains circular arcs into camber lines of a given stagger and chord
+
+      turns          turning angle of each circular arc, (..., narcs) degrees
+      relLengs       relative length of each circular arc, (..., narcs)
+      staggerAngle   stagger angle of each camber line, (...)
+      chord          chord length of each camber line, (...)
+      xStart         x location of each leading edge, (...)
+      yStart         y location of each leading edge, (...)
+      t              fractional position of each point along its arc,
+                     (..., narcs, npts)
+
+      returns the camber line points (..., narcs, npts), the chord locations
+      where the arcs start and end (..., narcs+1), and the angle of each arc
+      at its leading point (..., narcs)
+   '''
+
+   # each arc has its own turning angle and relative length
+   # relative lengths should add up to 1
+   staggerAngle = numpy.asarray( staggerAngle, dtype=float )[...,None]
+   chord = numpy.asarray( chord, dtype=float )[...,None]
+
+   # determine the angles necessary to match the slopes of the camber lines
+   rots = 0.5*turns[...,:1] + 0.5*turns - numpy.cumsum( turns, axis=-1 )
+
+   # fitting the arcs together results in an overall chord length and chord angle
+   xFinal = numpy.sum( relLengs*numpy.cos( rots*c_DEGtoRAD ), axis=-1 )
+   yFinal = numpy.sum( relLengs*numpy.sin( rots*c_DEGtoRAD ), axis=-1 )
+   chordLength = numpy.sqrt( xFinal**2. + yFinal**2. )[...,None]
+   chordAngle = ( numpy.arctan( yFinal/xFinal )/c_DEGtoRAD )[...,None]
+
+   # create the points on each arc, then move, scale, and rotate them to
+   # form the camber line; the overall chord length is scaled to the
+   # input chord and rotated to the input stagger angle
+   rotation = staggerAngle + rots - chordAngle
+   xArc, yArc = circularArc( turns, t )
+   xCL, yCL = MSR( xArc, yArc, relLengs/chordLength*chord, rotation, xStart, yStart )
+
+   return xCL, yCL, chordLocations( relLengs ), rotation + 0.5*turns
+
+
+
+
+def parabolicCamber( bladeAngleIn, bladeAngleOut ):
+   '''returns xf, a, b of a parabolic camber line  y = a(x^2) + b(x)  of
+      chord length 1 that matches the blade inlet and exit angles, and the
+      stagger angle of its chord'''
+
+   b = numpy.tan( bladeAngleIn*c_DEGtoRAD )
+   s = numpy.tan( bladeAngleOut*c_DEGtoRAD ) - numpy.tan( bladeAngleIn*c_DEGtoRAD )
+   xf = numpy.sqrt( 1./( 1.+s*s/4 + s*b + b*b ) )
+   a = s/(2*xf)
+
+   yf = a*xf*xf + b*xf
+   stagger = numpy.arctan( yf/xf )/c_DEGtoRAD
+
+   return ( xf, a, b ), stagger
+
+
+
+
+def bladeAngleCamber( bladeAngleIn, bladeAngleOut ):
+   '''returns the parabolic family parameters of the camber line that
+      parabolicCamber matches to the blade inlet and exit angles, and the
+      stagger angle to place it at'''
+
+   ( xf, a, b ), stagger = parabolicCamber( bladeAngleIn, bladeAngleOut )
+
+   # the parabola runs down from the leading edge, at minus the blade angles
+   # and minus the stagger angle of its chord
+   return { 'angleIn': stagger - bladeAngleIn, 'angleOut': stagger - bladeAngleOut }, -stagger
+
+
+
+
+class CamberFamily( object ):
+   '''camber line family, evaluated in closed form on a unit chord from
+      (0, 0) to (1, 0) and then moved to its stagger, chord and leading edge
+
+      a family is made of one or more pieces that split the chord; the
+      points of each piece are at fractional positions t along it.
+      Subclasses define
+
+      parameters   ( name, True for one value per piece ) of each parameter
+      pieces       returns the turning angle (degrees) and relative chord
+                   length of each piece, (..., npieces); the turning sets
+                   the side of the suction surface and the "adaptive" point
+                   clustering
+      evaluate     returns x, y and the camber line angle (degrees) of the
+                   points t, (..., npieces, npts)
+   '''
+
+   __slots__ = ()
+   parameters = ()
+
+   def prepare( self, params, nSections=1 ):
+      '''returns params as float arrays with one row per section, and the
+         number of sections; rows of 1 are broadcast to the others and to
+         nSections'''
+
+      values = {}
+      for name, perPiece in self.parameters:
+         if name not in params:
+            raise ValueError( "%s camber lines need '%s'" % ( type( self ).__name__, name ) )
+         value = numpy.asarray( params[name], dtype=float )
+         values[name] = numpy.atleast_2d( value ) if perPiece else numpy.atleast_1d( value )
+
+      nSections = numpy.broadcast( numpy.zeros( nSections ),
+                                   *[ value[:,0] if value.ndim > 1 else value for value in values.values() ] ).size
+      for name, value in values.items():
+         values[name] = numpy.broadcast_to( value, ( nSections, ) + value.shape[1:] )
+      return values, nSections
+
+   def pieces( self, params ):
+      raise NotImplementedError
+
+   def evaluate( self, params, t ):
+      raise NotImplementedError
+
+
+
+
+class CircularArcFamily( CamberFamily ):
+   '''chain of any number of circular arcs
+
+      turns      turning angle of each arc, (..., narcs) degrees
+      relLengs   relative length of each arc, (..., narcs)
+   '''
+
+   __slots__ = ()
+   parameters = ( ( 'turns', True ), ( 'relLengs', True ) )
+
+   def pieces( self, params ):
+      return params['turns'], params['relLengs']
+
+   def evaluate( self, params, t ):
+      turns = params['turns']
+      xCL, yCL, pctLocs, angle1 = circularArcCamber( turns, params['relLengs'], 0., 1., 0., 0., t )
+      return xCL, yCL, angle1[...,None] - t*turns[...,None]
+
+
+
+
+class ParabolicFamily( CamberFamily ):
+   '''parabolic arc, the quadratic curve through the leading and trailing
+      edges tangent to the camber line angles there
+
+      angleIn    camber line angle at the leading edge from the chord, (...)
+                 degrees, positive up
+      angleOut   camber line angle at the trailing edge from the chord, (...)
+                 degrees; the turning is angleIn - angleOut, so the two
+                 cannot have the same sign
+   '''
+
+   __slots__ = ()
+   parameters = ( ( 'angleIn', False ), ( 'angleOut', False ) )
+
+   def pieces( self, params ):
+      turning = params['angleIn'] - params['angleOut']
+      return turning[...,None], numpy.ones( turning.shape + ( 1, ) )
+
+   def evaluate( self, params, t ):
+      tanIn = numpy.tan( params['angleIn']*c_DEGtoRAD )[...,None,None]
+      tanOut = numpy.tan( params['angleOut']*c_DEGtoRAD )[...,None,None]
+      if numpy.any( tanIn*tanOut > 0. ):
+         raise ValueError( "parabolic camber line angles at the leading and trailing edges must not have the same sign" )
+
+      # the middle control point is where the edge tangents cross; the arc
+      # is flat when they do not
+      spread = tanIn - tanOut
+      xMid = numpy.where( spread != 0., -tanOut/numpy.where( spread != 0., spread, 1. ), 0.5 )
+      yMid = xMid*tanIn
+
+      # x = 2u(1-u)xMid + u^2 solved for the curve parameter u of each x = t
+      root = numpy.sqrt( xMid**2 + ( 1. - 2.*xMid )*t )
+      u = numpy.where( t > 0., t/numpy.where( t > 0., xMid + root, 1. ), 0. )
+
+      yCL = 2.*u*( 1. - u )*yMid
+      angle = numpy.arctan2( yMid*( 1. - 2.*u ), ( 1. - u )*xMid + u*( 1. - xMid ) )/c_DEGtoRAD
+      return numpy.broadcast_to( t, yCL.shape ), yCL, angle
+
+
+
+
+class NACA65Family( CamberFamily ):
+   '''NACA 65 series (a = 1.0) mean line of a design lift coefficient
+
+      liftCoefficient   design lift coefficient, (...); about 25 degrees of
+                        turning per unit lift coefficient
+   '''
+
+   __slots__ = ()
+   parameters = ( ( 'liftCoefficient', False ), )
+
+   def pieces( self, params ):
+      # the circular arc of the same maximum camber, which is at mid chord
+      maxCamber = params['liftCoefficient']/( 4.*numpy.pi )*numpy.log( 2. )
+      turning = 4.*numpy.arctan( 2.*maxCamber )/c_DEGtoRAD
+      return turning[...,None], numpy.ones( turning.shape + ( 1, ) )
+
+   def evaluate( self, params, t ):
+      k = ( params['liftCoefficient']/( 4.*numpy.pi ) )[...,None,None]
+      inside = ( t > 0. ) & ( t < 1. )
+      x = numpy.where( inside, t, 0.5 )
+
+      #  y = -k[ (1-x)ln(1-x) + x ln(x) ],  dy/dx = k ln( (1-x)/x )
+      # the slope is infinite at both edges, where y is 0
+      yCL = numpy.where( inside, -k*( ( 1. - x )*numpy.log( 1. - x ) + x*numpy.log( x ) ), 0. )
+      slope = numpy.where( inside, k*numpy.log( ( 1. - x )/x ), 0. )
+      angle = numpy.arctan( slope )/c_DEGtoRAD
+      edge = numpy.where( t <= 0., 90., -90. )*numpy.sign( k )
+      return numpy.broadcast_to( t, yCL.shape ), yCL, numpy.where( inside, angle, edge )
+
+
+
+
+# camber line families by name
+camberFamilies = {
+   "circularArc": CircularArcFamily(),
+   "parabolic": ParabolicFamily(),
+   "naca65": NACA65Family(),
+}
+
+
+
+def registerCamber( name, family ):
+   '''adds a CamberFamily to the registry, replacing any family of the
+      same name'''
+
+   if not isinstance( family, CamberFamily ):
+      raise ValueError( "camber family '%s' is not a CamberFamily" % name )
+   camberFamilies[name] = family
+   return family
+
+
+
+def getCamberFamily( family ):
+   '''returns the CamberFamily of a registered name, or family itself'''
+
+   if isinstance( family, CamberFamily ):
+      return family
+   if family not in camberFamilies:
+      raise ValueError( "unknown camber family '%s'" % family )
+   return camberFamilies[family]
+
+
+
+
+def camberLines( family, params, staggerAngle, chord, xStart, yStart, t ):
+   '''evaluates camber lines of a family and moves them to their stagger
+      angle, chord and leading edge
+
+      params         family parameters, prepared with one row per section
+      staggerAngle   stagger angle of each camber line, (...)
+      chord          chord length of each camber line, (...)
+      xStart         x location of each leading edge, (...)
+      yStart         y location of each leading edge, (...)
+      t              fractional position of each point along its piece,
+                     (..., npieces, npts)
+
+      returns the camber line points and angles (..., npieces, npts)
+   '''
+
+   x, y, angle = family.evaluate( params, t )
+
+   stagger = numpy.asarray( staggerAngle, dtype=float )[...,None,None]
+   chord = numpy.asarray( chord, dtype=float )[...,None,None]
+   cosStagger = chord*numpy.cos( stagger*c_DEGtoRAD )
+   sinStagger = chord*numpy.sin( stagger*c_DEGtoRAD )
+   xCL = numpy.asarray( xStart )[...,None,None] + x*cosStagger - y*sinStagger
+   yCL = numpy.asarray( yStart )[...,None,None] + x*sinStagger + y*cosStagger
+
+   return xCL, yCL, angle + stagger
+
+
+
+
+class CamberLine( object ):
+   '''camber line of any camber family
+
+      family         CamberFamily, or the name of a registered one:
+                     "circularArc", "parabolic", "naca65"
+      params         {name: value} of the family parameters
+      staggerAngle   stagger angle of the camber line
+      chord          chord length
+      xStart         x location of the leading edge
+      yStart         y location of the leading edge
+      t              fractional position of each point along its piece,
+                     (npieces, npts) from pointDistribution; 101 equally
+                     spaced points per piece when omitted
+   '''
+
+   __slots__ = ( 'xy', 'turns', 'angle', 'pctLocs', 'chord', 't' )
+
+   def __init__( self, family, params, staggerAngle, chord, xStart=0., yStart=0., t=None ):
+
+      family = getCamberFamily( family )
+      params, nSections = family.prepare( params )
+      if nSections != 1:
+         raise ValueError( "a CamberLine has one set of camber parameters" )
+      turns, relLengs = family.pieces( params )
+      if t is None:
+         t = pointDistribution( turns[0], relLengs[0] )
+      self.t = numpy.array( t, dtype=float )
+      self.chord = float( chord )
+
+      xCL, yCL, angle = camberLines( family, params, staggerAngle, chord, xStart, yStart, self.t[None] )
+      self.turns = turns[0]
+      self.pctLocs = chordLocations( relLengs[0] )
+      self.angle = angle[0]
+      self.xy = numpy.empty( ( xCL.size, 2 ) )
+      self.xy[:,0] = xCL.ravel()
+      self.xy[:,1] = yCL.ravel()
+
+   def arcs( self ):
+      '''returns the x, y points as one row per piece'''
+      shape = self.t.shape
+      return self.xy[:,0].reshape( shape ), self.xy[:,1].reshape( shape )
+
+   @property
+   def trailingEdge( self ):
+      return self.xy[-1]
+
+
+
+
+class Airfoil( object ):
+   '''airfoil made of a camber line and a thickness distribution
+
+      camberLine     CamberLine of the airfoil
+      maxTqC         scale factor on thickness-to-chord
+      thkProfile     default thickness profile of the airfoil
+
+      the camber line, suction surface, and pressure surface are stored in
+      one contiguous (3, npts, 2) array of x, y points
+   '''
+
+   __slots__ = ( 'camberLine', 'coords' )
+
+   def __init__( self, camberLine, maxTqC, thkProfile ):
+
+      self.camberLine = camberLine
+
+      # create the points on the upper and lower surfaces above each piece;
+      # the suction surface flips to the other side of negatively turning pieces
+      xCL, yCL = camberLine.arcs()
+      thick = maxTqC*camberLine.chord*getThickness( camberLine.pctLocs, camberLine.t, thkProfile )
+      xUS, yUS, xLS, yLS = offsetSurfaces( xCL, yCL, camberLine.angle,
+                                           numpy.where( camberLine.turns < 0, -1., 1. ), thick )
+
+      self.coords = numpy.empty( ( 3, ) + camberLine.xy.shape )
+      self.coords[0] = camberLine.xy
+      self.coords[1,:,0] = xUS.ravel()
+      self.coords[1,:,1] = yUS.ravel()
+      self.coords[2,:,0] = xLS.ravel()
+      self.coords[2,:,1] = yLS.ravel()
+
+   @property
+   def camber( self ):
+      return self.coords[0]
+
+   @property
+   def suction( self ):
+      return self.coords[1]
+
+   @property
+   def pressure( self ):
+      return self.coords[2]
+
+
+
+
+def genAirfoil( turn1, turn2, turn3, relLeng1, relLeng2, relLeng3, maxTqC, thkProfile,
+                staggerAngle, chord, xStart=0., yStart=0., camber="circularArc",
+                npts=101, clustering="uniform", camberParams=None ):
+   '''defines a camber line and airfoil
+
+      returns the camber line, suction surface, and pressure surface as
+      (npts, 2) arrays of x, y points
+
+      arguments are
+      turn1          turning angle of the 1st circular arc, degrees
+      turn2          turning angle of the 2nd circular arc, degrees
+      turn3          turning angle of the 3rd circular arc, degrees
+      relLeng1       relative length of the 1st circular arc
+      relLeng2       relative length of the 2nd circular arc
+      relLeng3       relative length of the 3rd circular arc
+      maxTqC         scale factor on thickness-to-chord
+      thkProfile     default thickness profile of the airfoil
+      staggerAngle   stagger angle of the airfoil
+      chord          chord length
+      xStart         x location of the leading edge
+      yStart         y location of the leading edge
+      camber         camber family, see CamberLine; the arcs are used by
+                     "circularArc" and camberParams by the others
+      npts           number of points on each piece
+      clustering     "uniform", "cosine" or "adaptive" point spacing, see
+                     pointDistribution
+      camberParams   {name: value} of the camber family parameters
+   '''
+
+   if camberParams is None:
+      camberParams = { 'turns': [ turn1, turn2, turn3 ], 'relLengs': [ relLeng1, relLeng2, relLeng3 ] }
+   coords = camberAirfoils( camber, camberParams, maxTqC, thkProfile, staggerAngle, chord,
+                            [ xStart, yStart ], npts, clustering )
+
+   return coords[0,0], coords[1,0], coords[2,0]
+
+
+
+
+def camberAirfoils( family, params, maxTqC, thkProfile, staggerAngle, chord, origin,
+                    npts=101, clustering="uniform" ):
+   '''defines N airfoils of one camber family in one vectorized pass
+
+      returns a (3, N, npieces*npts, 2) array of x, y points, holding the
+      camber lines, suction surfaces, and pressure surfaces of all the
+      airfoils
+
+      arguments are
+      family         CamberFamily, or the name of a registered one
+      params         {name: value} of the family parameters, (N) or
+                     (N, npieces) for those given per piece
+      maxTqC         scale factor on thickness-to-chord, (N)
+      thkProfile     thickness profile shared by all the airfoils
+      staggerAngle   stagger angle of each airfoil, (N)
+      chord          chord length of each airfoil, (N)
+      origin         x, y location of each leading edge, (N, 2)
+      npts           number of points on each piece
+      clustering     "uniform", "cosine" or "adaptive" point spacing, see
+                     pointDistribution
+
+      scalar arguments are applied to every airfoil
+   '''
+
+   family = getCamberFamily( family )
+   maxTqC = numpy.atleast_1d( numpy.asarray( maxTqC, dtype=float ) )
+   staggerAngle = numpy.atleast_1d( numpy.asarray( staggerAngle, dtype=float ) )
+   chord = numpy.atleast_1d( numpy.asarray( chord, dtype=float ) )
+   origin = numpy.asarray( origin, dtype=float ).reshape( -1, 2 )
+   params, nSections = family.prepare( params, numpy.broadcast( maxTqC, staggerAngle, chord, origin[:,0] ).size )
+   maxTqC = numpy.broadcast_to( maxTqC, ( nSections, ) )
+   staggerAngle = numpy.broadcast_to( staggerAngle, ( nSections, ) )
+   chord = numpy.broadcast_to( chord, ( nSections, ) )
+   origin = numpy.broadcast_to( origin, ( nSections, 2 ) )
+
+   turns, relLengs = family.pieces( params )
+   turns = numpy.broadcast_to( turns, relLengs.shape )
+   nPieces = turns.shape[-1]
+   t = pointDistribution( turns, relLengs, npts, clustering, maxTqC[:,None], thkProfile )
+   xCL, yCL, angle = camberLines( family, params, staggerAngle, chord, origin[:,0], origin[:,1], t )
+
+   # create the points on the upper and lower surfaces above each piece;
+   # the suction surface flips to the other side of negatively turning pieces
+   thick = ( maxTqC*chord )[:,None,None]*getThickness( chordLocations( relLengs ), t, thkProfile )
+   xUS, yUS, xLS, yLS = offsetSurfaces( xCL, yCL, angle, numpy.where( turns < 0, -1., 1. ), thick )
+
+   coords = numpy.empty( ( 3, nSections, nPieces*npts, 2 ) )
+   for i, ( x, y ) in enumerate( ( ( xCL, yCL ), ( xUS, yUS ), ( xLS, yLS ) ) ):
+      coords[i,:,:,0] = x.reshape( nSections, -1 )
+      coords[i,:,:,1] = y.reshape( nSections, -1 )
+
+   return coords
+
+
+
+
+def genAirfoils( turns, relLengs, maxTqC, thkProfile, staggerAngle, chord, origin,
+                 npts=101, clustering="uniform" ):
+   '''defines N multiple circular arc airfoils in one vectorized pass
+
+      returns a (3, N, npts, 2) array of x, y points, holding the camber
+      lines, suction surfaces, and pressure surfaces of all the airfoils
+
+      arguments are
+      turns          turning angle of each circular arc, (N, narcs) degrees
+      relLengs       relative length of each circular arc, (N, narcs)
+      maxTqC         scale factor on thickness-to-chord, (N)
+      thkProfile     thickness profile shared by all the airfoils
+      staggerAngle   stagger angle of each airfoil, (N)
+      chord          chord length of each airfoil, (N)
+      origin         x, y location of each leading edge, (N, 2)
+      npts           number of points on each arc
+      clustering     "uniform", "cosine" or "adaptive" point spacing, see
+                     pointDistribution
+
+      scalar arguments are applied to every airfoil; every camber line is
+      made of circular arcs, whatever its turning.  Other camber families
+      are made by camberAirfoils.
+   '''
+
+   return camberAirfoils( "circularArc", { 'turns': turns, 'relLengs': relLengs }, maxTqC, thkProfile,
+                          staggerAngle, chord, origin, npts, clustering )
@@ -0,0 +1,590 @@
+#
+# =============================================================================
+#          BENCHMARKS OF THE GEOMETRY, PARSING AND PLOTTING HOT PATHS
+#                      (SYNTHETIC SECTIONS, STREAMS AND CASES, LEGACY SCRIPTS
+#                       AND CURRENT ENGINES, RESULTS WRITTEN AS CSV)
+#
+# =============================================================================
+
+
+# python benchmark.py -o bench.csv
+# python benchmark.py -o bench.csv --scale full -b genAirfoil,getThickness
+# python benchmark.py -o after.csv --compare before.csv
+
+
+import argparse
+import ast
+import csv
+import gc
+import os
+import platform
+import re
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import types
+
+# render off screen, so this has to come before pylab is imported
+import matplotlib
+matplotlib.use( "Agg" )
+import numpy
+import pylab
+
+import airfoilGeometry
+import plotAirfoilAndVT
+from bladesOutReader import readBladesOut, readBladesOutDir
+from streamAverage import mixedOut, readStreams
+from viewOutReader import readPages
+
+repoDir = os.path.dirname( os.path.abspath( __file__ ) )
+templateBladesOut = os.path.join( repoDir, "test_output", "test_2stgCRturbine.bladesOut" )
+templateViewOut = os.path.join( repoDir, "test_output", "test_2stgCRturbine.viewOut" )
+
+resultFields = ( "benchmark", "engine", "size", "unit", "repeat", "seconds", "throughput", "peakMB",
+                 "revision", "python", "numpy" )
+
+# sizes run for each kind of input
+sizeGrids = {
+   "small": { "sections": ( 1, 100, 1000 ), "streams": ( 1, 10 ), "cases": ( 1, 100 ) },
+   "full":  { "sections": ( 1, 10, 100, 1000, 10000, 100000 ), "streams": ( 1, 5, 10, 25, 50 ),
+              "cases": ( 1, 10, 100, 1000, 10000 ) },
+}
+
+# blade row fields that hold one value per stream in the synthetic files
+streamFields = ( "velocityIn", "alphaIn", "UbladeIn", "vRelIn", "betaIn", "bladeAngleIn",
+                 "velocityOut", "alphaOut", "UbladeOut", "vRelOut", "betaOut", "bladeAngleOut" )
+
+
+
+
+def gitOutput( *args ):
+   '''returns the output of a git command run in the repository, None when
+      git or the repository is not available'''
+
+   try:
+      result = subprocess.run( ( "git", ) + args, cwd=repoDir, capture_output=True, text=True )
+   except OSError:
+      return None
+   return result.stdout.strip() if result.returncode == 0 else None
+
+
+
+
+def legacyModule( fname, revision=None ):
+   '''returns the functions of a script as it was at a git revision (the
+      first commit when None), without running its top level plotting
+
+      the imports, function definitions and call free assignments (the
+      thickness tables, c_DEGtoRAD) of the script are run in a new module;
+      the script's globals are then set on the module, as the script did
+   '''
+
+   if revision is None:
+      revision = ( gitOutput( "rev-list", "--max-parents=0", "HEAD" ) or "" ).split( "\n" )[-1]
+   source = gitOutput( "show", "%s:%s" % ( revision, fname ) )
+   if not source:
+      raise ValueError( "%s is not in revision '%s'" % ( fname, revision ) )
+
+   keep = []
+   for node in ast.parse( source ).body:
+      if isinstance( node, ( ast.Import, ast.ImportFrom, ast.FunctionDef, ast.ClassDef ) ):
+         keep.append( node )
+      elif isinstance( node, ast.Assign ) and not any( isinstance( n, ast.Call ) for n in ast.walk( node ) ):
+         keep.append( node )
+
+   module = types.ModuleType( "legacy_" + os.path.splitext( fname )[0] )
+   module.xrange = range
+   exec( compile( ast.Module( keep, type_ignores=[] ), "%s:%s" % ( revision, fname ), "exec" ), module.__dict__ )
+   return module
+
+
+
+
+def measure( run, repeat=3 ):
+   '''returns the best wall time of repeat calls of run, seconds, and the
+      peak Python and NumPy heap memory of one more call, MB'''
+
+   best = numpy.inf
+   for i in range( repeat ):
+      gc.collect()
+      start = time.perf_counter()
+      run()
+      best = min( best, time.perf_counter() - start )
+
+   gc.collect()
+   tracemalloc.start()
+   try:
+      run()
+      peak = tracemalloc.get_traced_memory()[1]
+   finally:
+      tracemalloc.stop()
+
+   return best, peak/2.**20
+
+
+
+
+# =============================================================================
+#          SYNTHETIC INPUTS
+# =============================================================================
+
+def syntheticSections( n, seed=0 ):
+   '''returns n random three arc sections: turns, relLengs (n, 3), maxTqC,
+      staggerAngle, chord (n) and origin (n, 2)'''
+
+   rng = numpy.random.default_rng( seed )
+   return { 'turns': rng.uniform( -10., 50., ( n, 3 ) ),
+            'relLengs': rng.dirichlet( ( 3., 3., 3. ), n ),
+            'maxTqC': rng.uniform( 0.6, 1.2, n ),
+            'staggerAngle': rng.uniform( -40., 40., n ),
+            'chord': rng.uniform( 0.5, 2., n ),
+            'origin': rng.uniform( 0., 10., ( n, 2 ) ) }
+
+
+
+
+def syntheticBladesOut( nStreams, seed=0 ):
+   '''returns the text of a .bladesOut file holding the blade rows of the
+      test case with nStreams streams each, hub to tip; one stream is
+      written as scalars, more as lists, as outputVT does'''
+
+   rng = numpy.random.default_rng( seed )
+   rows = readBladesOut( templateBladesOut )
+   lines = []
+   for BR in rows:
+      lines.append( "%s = { " % BR['bladerowName'] )
+      entries = []
+      for key in BR.dtype.names:
+         if key not in streamFields:
+            entries.append( "   %-14s: '%s'" % ( "'%s'" % key, BR[key] ) )
+            continue
+         values = BR[key]*( 1. + 0.02*numpy.linspace( -1., 1., nStreams ) + 0.001*rng.standard_normal( nStreams ) )
+         if nStreams == 1:
+            entries.append( "   %-14s: %g" % ( "'%s'" % key, values[0] ) )
+         else:
+            entries.append( "   %-14s: [ %s ]" % ( "'%s'" % key, ", ".join( "%g" % value for value in values ) ) )
+      lines.append( ",\n".join( entries ) )
+      lines.append( " }\n" )
+   lines.append( "BRnames = [ %s,  ]\n" % ", ".join( rows['bladerowName'] ) )
+   return "\n".join( lines )
+
+
+
+
+def syntheticViewOut( nCases ):
+   '''returns the text of a page viewer file with nCases copies of the
+      first page of the test case, numbered by case'''
+
+   with open( templateViewOut ) as f:
+      text = f.read()
+   starts = [ match.start() for match in re.finditer( r"^\*{5}", text, re.MULTILINE ) ]
+   page = text[ starts[0]:( starts[1] if len(starts) > 1 else len(text) ) ]
+   return "".join( re.sub( r"case:\s*\S+", "case: %6d" % case, page ) for case in range( nCases ) )
+
+
+
+
+# =============================================================================
+#          BENCHMARKS
+#
+#          each engine's setup( size, workdir ) builds its inputs and
+#          returns the call to time
+# =============================================================================
+
+def legacyPlot():
+   return legacyModule( "plotAirfoilAndVT.py" )
+
+
+
+
+def sectionArcs( sections, npts=101 ):
+   '''returns the inputs of MSR, surface and getThickness for sections'''
+
+   t = airfoilGeometry.pointDistribution( sections['turns'], sections['relLengs'], npts )
+   xCL, yCL, pctLocs, angle1 = airfoilGeometry.circularArcCamber( sections['turns'], sections['relLengs'],
+      sections['staggerAngle'], sections['chord'], sections['origin'][:,0], sections['origin'][:,1], t )
+   thick = ( sections['maxTqC']*sections['chord'] )[:,None,None]*airfoilGeometry.getThickness( pctLocs, t, "Aseries" )
+   return t, xCL, yCL, pctLocs, angle1, thick
+
+
+
+
+def genAirfoilLegacy( size, workdir ):
+   legacy = legacyPlot()
+   s = syntheticSections( size )
+
+   def run():
+      figure = pylab.figure()
+      for i in range( size ):
+         # the script placed each airfoil through its xStart, yStart globals
+         legacy.xStart, legacy.yStart = s['origin'][i]
+         legacy.genAirfoil( s['turns'][i,0], s['turns'][i,1], s['turns'][i,2], s['relLengs'][i,0],
+                            s['relLengs'][i,1], s['relLengs'][i,2], s['maxTqC'][i], "Aseries",
+                            s['staggerAngle'][i], s['chord'][i] )
+      pylab.close( figure )
+   return run
+
+
+
+
+def genAirfoilScalar( size, workdir ):
+   s = syntheticSections( size )
+
+   def run():
+      for i in range( size ):
+         airfoilGeometry.genAirfoil( s['turns'][i,0], s['turns'][i,1], s['turns'][i,2], s['relLengs'][i,0],
+                                     s['relLengs'][i,1], s['relLengs'][i,2], s['maxTqC'][i], "Aseries",
+                                     s['staggerAngle'][i], s['chord'][i], s['origin'][i,0], s['origin'][i,1] )
+   return run
+
+
+
+
+def genAirfoilBatch( size, workdir ):
+   s = syntheticSections( size )
+   return lambda: airfoilGeometry.genAirfoils( s['turns'], s['relLengs'], s['maxTqC'], "Aseries",
+                                               s['staggerAngle'], s['chord'], s['origin'] )
+
+
+
+
+def genAirfoilFamily( family ):
+   '''setup of the batched airfoils of a single piece camber family'''
+
+   def setup( size, workdir ):
+      s = syntheticSections( size )
+      turning = s['turns'].sum( axis=-1 )
+      params = { "circularArc": { 'turns': turning[:,None], 'relLengs': numpy.ones( ( size, 1 ) ) },
+                 "parabolic": { 'angleIn': 0.6*turning, 'angleOut': -0.4*turning },
+                 "naca65": { 'liftCoefficient': turning/25. } }[family]
+      return lambda: airfoilGeometry.camberAirfoils( family, params, s['maxTqC'], "Aseries",
+                                                     s['staggerAngle'], s['chord'], s['origin'], 303 )
+   return setup
+
+
+
+
+def MSRLegacy( size, workdir ):
+   legacy = legacyPlot()
+   s = syntheticSections( size )
+   xArc, yArc = airfoilGeometry.circularArc( s['turns'], numpy.broadcast_to( numpy.linspace( 0., 1., 101 ), ( size, 3, 101 ) ) )
+   xArc, yArc = xArc.tolist(), yArc.tolist()
+
+   def run():
+      for i in range( size ):
+         legacy.xCL = []
+         legacy.yCL = []
+         xa, ya = s['origin'][i]
+         for arc in range( 3 ):
+            legacy.xArc = xArc[i][arc]
+            legacy.yArc = yArc[i][arc]
+            legacy.MSR( s['relLengs'][i,arc]*s['chord'][i], s['staggerAngle'][i], xa, ya, xa, ya )
+            xa, ya = legacy.xLast, legacy.yLast
+   return run
+
+
+
+
+def MSRVectorized( size, workdir ):
+   s = syntheticSections( size )
+   xArc, yArc = airfoilGeometry.circularArc( s['turns'], numpy.broadcast_to( numpy.linspace( 0., 1., 101 ), ( size, 3, 101 ) ) )
+   scale = s['relLengs']*s['chord'][:,None]
+   rotation = numpy.repeat( s['staggerAngle'][:,None], 3, axis=1 )
+   return lambda: airfoilGeometry.MSR( xArc, yArc, scale, rotation, s['origin'][:,0], s['origin'][:,1] )
+
+
+
+
+def surfaceLegacy( size, workdir ):
+   legacy = legacyPlot()
+   s = syntheticSections( size )
+   t, xCL, yCL, pctLocs, angle1, thick = sectionArcs( s )
+   xCL, yCL = xCL.reshape( size, -1 ).tolist(), yCL.reshape( size, -1 ).tolist()
+
+   def run():
+      for i in range( size ):
+         legacy.xCL, legacy.yCL = xCL[i], yCL[i]
+         legacy.xUS, legacy.yUS, legacy.xLS, legacy.yLS = [], [], [], []
+         for arc in range( 3 ):
+            legacy.surface( angle1[i,arc], s['turns'][i,arc], s['maxTqC'][i]*s['chord'][i],
+                            pctLocs[i,arc], pctLocs[i,arc+1], 101*arc, "Aseries" )
+   return run
+
+
+
+
+def surfaceVectorized( size, workdir ):
+   s = syntheticSections( size )
+   t, xCL, yCL, pctLocs, angle1, thick = sectionArcs( s )
+   return lambda: airfoilGeometry.surface( xCL, yCL, angle1, s['turns'], thick, t )
+
+
+
+
+def getThicknessLegacy( size, workdir ):
+   legacy = legacyPlot()
+   pctLocs = airfoilGeometry.chordLocations( syntheticSections( size )['relLengs'] ).tolist()
+
+   def run():
+      for locs in pctLocs:
+         for arc in range( 3 ):
+            for i in range( 101 ):
+               legacy.getThickness( locs[arc], locs[arc+1], i, "Aseries" )
+   return run
+
+
+
+
+def getThicknessVectorized( size, workdir ):
+   s = syntheticSections( size )
+   pctLocs = airfoilGeometry.chordLocations( s['relLengs'] )
+   t = airfoilGeometry.pointDistribution( s['turns'], s['relLengs'] )
+   return lambda: airfoilGeometry.getThickness( pctLocs, t, "Aseries" )
+
+
+
+
+def writeBladesOut( workdir, nStreams, nCases=1 ):
+   '''writes nCases synthetic .bladesOut files to workdir; returns their names'''
+
+   fnames = []
+   for case in range( nCases ):
+      fname = os.path.join( workdir, "case%05d.bladesOut" % case )
+      with open( fname, "w" ) as f:
+         f.write( syntheticBladesOut( nStreams, seed=case ) )
+      fnames.append( fname )
+   return fnames
+
+
+
+
+def plotLegacy( size, workdir ):
+   legacy = legacyPlot()
+   BRnames = {}
+   exec( syntheticBladesOut( size ), BRnames )
+
+   def run():
+      # the script plotted one stream at a time from its BR global
+      for BR in BRnames['BRnames']:
+         figure = pylab.figure( figsize=(10,10) )
+         for stream in range( size ):
+            legacy.BR = dict( ( key, value[stream] if isinstance( value, list ) else value )
+                              for key, value in BR.items() )
+            legacy.plotVelocityTriangles()
+         figure.canvas.draw()
+         pylab.close( figure )
+   return run
+
+
+
+
+def plotCurrent( size, workdir ):
+   rows = readBladesOut( writeBladesOut( workdir, size )[0] )
+
+   def run():
+      for BR in rows:
+         figure = plotAirfoilAndVT.plotBladeRow( BR )
+         figure.canvas.draw()
+         pylab.close( figure )
+   return run
+
+
+
+
+def bladesOutLegacy( size, workdir ):
+   fnames = writeBladesOut( workdir, 4, size )
+
+   def run():
+      for fname in fnames:
+         namespace = {}
+         exec( open( fname ).read(), namespace )
+   return run
+
+
+
+
+def bladesOutCurrent( size, workdir ):
+   writeBladesOut( workdir, 4, size )
+   return lambda: readBladesOutDir( workdir )
+
+
+
+
+def writeViewOut( workdir, nCases ):
+   fname = os.path.join( workdir, "sweep.viewOut" )
+   with open( fname, "w" ) as f:
+      f.write( syntheticViewOut( nCases ) )
+   return fname
+
+
+
+
+def viewOutColumns( size, workdir ):
+   fname = writeViewOut( workdir, size )
+
+   def run():
+      for page in readPages( fname ):
+         page["OUTPUT FLOW"]["Pt"]
+         page["BladeSegment Geometry"]["phi"]
+   return run
+
+
+
+
+def viewOutMixedOut( size, workdir ):
+   fname = writeViewOut( workdir, size )
+
+   def run():
+      stations, streams = readStreams( readPages( fname ) )
+      mixedOut( streams )
+   return run
+
+
+
+
+# name: ( size kind, engines { name: ( setup, largest size or None ) } )
+# the legacy scripts loop in Python over every point, so they are capped
+benchmarks = {
+   "genAirfoil":     ( "sections", { "legacy": ( genAirfoilLegacy, 1000 ),
+                                     "scalar": ( genAirfoilScalar, 10000 ),
+                                     "batch": ( genAirfoilBatch, None ),
+                                     "circularArc": ( genAirfoilFamily( "circularArc" ), None ),
+                                     "parabolic": ( genAirfoilFamily( "parabolic" ), None ),
+                                     "naca65": ( genAirfoilFamily( "naca65" ), None ) } ),
+   "MSR":            ( "sections", { "legacy": ( MSRLegacy, 1000 ),
+                                     "vectorized": ( MSRVectorized, None ) } ),
+   "surface":        ( "sections", { "legacy": ( surfaceLegacy, 10000 ),
+                                     "vectorized": ( surfaceVectorized, None ) } ),
+   "getThickness":   ( "sections", { "legacy": ( getThicknessLegacy, 10000 ),
+                                     "vectorized": ( getThicknessVectorized, None ) } ),
+   "plotVelocityTriangles": ( "streams", { "legacy": ( plotLegacy, None ),
+                                           "current": ( plotCurrent, None ) } ),
+   "bladesOut":      ( "cases", { "legacy": ( bladesOutLegacy, None ),
+                                  "current": ( bladesOutCurrent, None ) } ),
+   "viewOut":        ( "cases", { "columns": ( viewOutColumns, None ),
+                                  "mixedOut": ( viewOutMixedOut, None ) } ),
+}
+
+
+
+
+def runBenchmarks( names=None, engines=None, scale="small", sizes=None, repeat=3, log=print ):
+   '''runs benchmarks and returns one result row (a dict of resultFields)
+      per benchmark, engine and size
+
+      names      benchmarks to run, all when None
+      engines    engines to run, all when None
+      scale      "small" or "full" size grid, see sizeGrids
+      sizes      {size kind: sizes} replacing those of the grid
+      log        called with a line per result, None for quiet
+   '''
+
+   grid = dict( sizeGrids[scale] )
+   grid.update( sizes or {} )
+   stamp = { "revision": gitOutput( "rev-parse", "--short", "HEAD" ) or "",
+             "python": platform.python_version(), "numpy": numpy.__version__ }
+
+   results = []
+   for name in ( names or list( benchmarks ) ):
+      if name not in benchmarks:
+         raise ValueError( "unknown benchmark '%s'" % name )
+      kind, setups = benchmarks[name]
+      for engine, ( setup, largest ) in setups.items():
+         if engines is not None and engine not in engines:
+            continue
+         for size in grid[kind]:
+            if largest is not None and size > largest:
+               continue
+            with tempfile.TemporaryDirectory() as workdir:
+               try:
+                  run = setup( size, workdir )
+               except ValueError as error:
+                  if log is not None:
+                     log( "%-22s %-12s skipped: %s" % ( name, engine, error ) )
+                  break
+               seconds, peak = measure( run, repeat )
+
+            result = dict( stamp, benchmark=name, engine=engine, size=size, unit=kind, repeat=repeat,
+                           seconds=seconds, throughput=size/seconds, peakMB=peak )
+            results.append( result )
+            if log is not None:
+               log( "%-22s %-12s %8d %-8s %12.6f s %14.1f %s/s %10.2f MB" %
+                    ( name, engine, size, kind, seconds, size/seconds, kind, peak ) )
+
+   return results
+
+
+
+
+def writeResults( fname, results ):
+   '''writes result rows to a csv file'''
+
+   with open( fname, "w", newline="" ) as f:
+      writer = csv.DictWriter( f, resultFields )
+      writer.writeheader()
+      for result in results:
+         writer.writerow( dict( ( key, result[key] ) for key in resultFields ) )
+
+
+
+
+def readResults( fname ):
+   '''reads the result rows of a csv file written by writeResults'''
+
+   with open( fname, newline="" ) as f:
+      results = list( csv.DictReader( f ) )
+   for result in results:
+      for key in ( "size", "repeat" ):
+         result[key] = int( result[key] )
+      for key in ( "seconds", "throughput", "peakMB" ):
+         result[key] = float( result[key] )
+   return results
+
+
+
+
+def compareResults( base, current, threshold=1.2 ):
+   '''matches current results to base results by benchmark, engine and
+      size; returns ( benchmark, engine, size, time ratio, memory ratio,
+      regressed ) rows, regressed when either ratio is over threshold'''
+
+   key = lambda result: ( result["benchmark"], result["engine"], result["size"] )
+   before = dict( ( key( result ), result ) for result in base )
+
+   rows = []
+   for result in current:
+      old = before.get( key( result ) )
+      if old is None:
+         continue
+      timeRatio = result["seconds"]/old["seconds"]
+      memoryRatio = result["peakMB"]/old["peakMB"] if old["peakMB"] > 0. else 1.
+      rows.append( key( result ) + ( timeRatio, memoryRatio, timeRatio > threshold or memoryRatio > threshold ) )
+   return rows
+
+
+
+
+if __name__ == "__main__":
+
+   parser = argparse.ArgumentParser( description="benchmarks of geometry generation, parsing and plotting" )
+   parser.add_argument( "-o", "--output", default="bench.csv", help="csv file for the results" )
+   parser.add_argument( "-b", "--benchmarks", default=None, help="comma separated benchmarks, all by default" )
+   parser.add_argument( "-e", "--engines", default=None, help="comma separated engines, all by default" )
+   parser.add_argument( "--scale", default="small", choices=sorted( sizeGrids ), help="size grid" )
+   parser.add_argument( "--repeat", type=int, default=3, help="timed calls, the best is kept" )
+   parser.add_argument( "--compare", default=None, help="earlier results csv to compare against" )
+   parser.add_argument( "--threshold", type=float, default=1.2, help="ratio flagged as a regression" )
+   args = parser.parse_args()
+
+   split = lambda text: text.split( "," ) if text else None
+   results = runBenchmarks( split( args.benchmarks ), split( args.engines ), args.scale, repeat=args.repeat )
+   writeResults( args.output, results )
+   print( "%d results in %s" % ( len(results), args.output ) )
+
+   if args.compare:
+      rows = compareResults( readResults( args.compare ), results, args.threshold )
+      print( "%-22s %-12s %8s %10s %10s" % ( "benchmark", "engine", "size", "time", "memory" ) )
+      for name, engine, size, timeRatio, memoryRatio, regressed in rows:
+         print( "%-22s %-12s %8d %9.2fx %9.2fx %s" % ( name, engine, size, timeRatio, memoryRatio,
+                                                        "REGRESSION" if regressed else "" ) )
@@ -0,0 +1,126 @@
+#
+# =============================================================================
+#          VECTORIZED BladeGeometry EVALUATION
+#                      (PITCH, CHORD, SOLIDITY, THICKNESS, OPENING, STAGGER
+#                       AND TRAILING EDGE OF EVERY SEGMENT OF EVERY ROW)
+#
+# =============================================================================
+
+
+import numpy
+
+# BladeGeometry sockets, the variable each sets, and the *_in value used
+# when the socket is empty (S_OqSvR falls back to opening_in instead)
+geometrySockets = (
+   ( "S_CHORDvR",     "chord",            1.0 ),
+   ( "S_ZETAvR",      "staggerAngle",     0. ),
+   ( "S_THKqCvR",     "thicknessToChord", 0. ),
+   ( "S_THK_LOCqCvR", "aqc",              0.1 ),
+   ( "S_TE_THKvR",    "TEthickness",      0. ),
+   ( "S_RCvR",        "bladeRc",          3.0 ),
+   ( "S_OqSvR",       "openingToPitch",   None ),
+)
+
+# inputs without a socket and their BladeGeometry values
+geometryInputs = { "opening_in": 1., "tipClearance_in": 0. }
+
+geometryNames = ( "pitch", "chord", "pitchToChord", "solidity", "tipClearance", "tipClearanceToBladeHeight",
+                  "thicknessToChord", "opening", "openingToPitch", "TEthickness", "TEthicknessToPitch",
+                  "bladeRc", "staggerAngle", "axialChord", "aqc" )
+
+
+
+
+def evaluateSchedule( schedule, percentSpan, default ):
+   '''returns a schedule at percentSpan: a callable (an npssTables Table or
+      any function of percent span) is evaluated, a number is used at every
+      station and None falls back to default'''
+
+   percentSpan = numpy.asarray( percentSpan, dtype=float )
+   if schedule is None:
+      schedule = default
+   if callable( schedule ):
+      return numpy.broadcast_to( numpy.asarray( schedule( percentSpan ), dtype=float ), percentSpan.shape )
+   return numpy.full( percentSpan.shape, float( schedule ) )
+
+
+
+
+def rowGeometry( radius, percentSpan, numberOfBlades, bladeHeight, schedules ):
+   '''BladeGeometry.calculate for the segments of one row
+
+      radius         segment radius (radiusInlet), in
+      percentSpan    segment percent span (percentLEspan)
+      schedules      {name: value} of the subelement: socket names
+                     (S_CHORDvR, ...) hold tables or functions of percent
+                     span, *_in names (chord_in, ...) the values used when
+                     a socket is empty
+
+      returns {variable: array} of geometryNames
+   '''
+
+   radius = numpy.asarray( radius, dtype=float )
+   pitch = 2.*numpy.pi*radius/numberOfBlades
+   values = { 'pitch': pitch }
+
+   for socket, name, default in geometrySockets:
+      if socket == "S_OqSvR":
+         continue
+      values[name] = evaluateSchedule( schedules.get( socket ), percentSpan,
+                                       schedules.get( name + "_in", default ) )
+
+   if schedules.get( "S_OqSvR" ) is None:
+      values['opening'] = numpy.full( pitch.shape, float( schedules.get( "opening_in", geometryInputs["opening_in"] ) ) )
+      values['openingToPitch'] = values['opening']/pitch
+   else:
+      values['openingToPitch'] = evaluateSchedule( schedules["S_OqSvR"], percentSpan, None )
+      values['opening'] = values['openingToPitch']*pitch
+
+   tipClearance = float( schedules.get( "tipClearance_in", geometryInputs["tipClearance_in"] ) )
+   values['pitchToChord'] = pitch/values['chord']
+   values['solidity'] = values['chord']/pitch
+   values['tipClearance'] = numpy.full( pitch.shape, tipClearance )
+   values['tipClearanceToBladeHeight'] = tipClearance/bladeHeight + 0.*pitch
+   values['TEthicknessToPitch'] = values['TEthickness']/pitch
+   values['axialChord'] = values['chord']*numpy.cos( values['staggerAngle'] )
+
+   return values
+
+
+
+
+def bladeGeometry( radius, percentSpan, numberOfBlades, bladeHeight=1., schedules=None, row=None ):
+   '''evaluates BladeGeometry for any number of segments of any number of
+      rows in one call
+
+      radius, percentSpan   segment radius (in) and percent span, arrays
+      row                   row index of each segment; None for one row
+      numberOfBlades,       blade count and BladeRow bladeHeight (in), one
+      bladeHeight           per row (indexed by row) or one for all
+      schedules             BladeGeometry subelement inputs, one {name:
+                            value} per row or one for all, see rowGeometry
+
+      each table is evaluated once per row on all of that row's segments.
+      Returns {variable: array} of geometryNames, shaped like radius.
+   '''
+
+   radius = numpy.asarray( radius, dtype=float )
+   percentSpan = numpy.broadcast_to( numpy.asarray( percentSpan, dtype=float ), radius.shape )
+   if schedules is None:
+      schedules = {}
+
+   if row is None:
+      return rowGeometry( radius, percentSpan, numberOfBlades, bladeHeight, schedules )
+
+   row = numpy.broadcast_to( numpy.asarray( row, dtype=int ), radius.shape )
+   perRow = lambda value, r: value[r] if numpy.ndim( value ) else value
+   values = dict( ( name, numpy.full( radius.shape, numpy.nan ) ) for name in geometryNames )
+   for r in numpy.unique( row ):
+      mine = row == r
+      rowSchedules = schedules if isinstance( schedules, dict ) else schedules[r]
+      result = rowGeometry( radius[mine], percentSpan[mine], perRow( numberOfBlades, r ),
+                            perRow( bladeHeight, r ), rowSchedules )
+      for name in geometryNames:
+         values[name][mine] = result[name]
+
+   return values
@@ -0,0 +1,309 @@
+#
+# =============================================================================
+#          3-D BLADE STACKING FROM SPANWISE BladeGeometry SCHEDULES
+#                      (SECTIONS STACKED, WRAPPED ONTO THE RADIUS AND
+#                       WRITTEN AS WATERTIGHT BINARY STL OR .npz)
+#
+# =============================================================================
+
+
+# from npssTables import loadTables
+# tables = loadTables( "rotor1Geometry.int" )
+# blade = stackBlade( { "S_CHORDvR": tables["TB_chord"], "S_ZETAvR": tables["TB_stagger"],
+#                       "S_THKqCvR": 0.06, "camber": tables["TB_camber"] }, 3.11, 4.09, spanStations=200 )
+# writeSTL( "rotor1.stl", blade, numberOfBlades=43 )
+
+
+import numpy
+
+import airfoilGeometry
+from bladeGeometry import evaluateSchedule, geometrySockets
+
+c_DEGtoRAD = numpy.pi/180.
+
+# schedules the sections need besides the BladeGeometry ones: camber (deg)
+# and the axial (sweep) and tangential (lean) offsets of the stacking axis,
+# in
+sectionSchedules = ( ( "camber", 0. ), ( "sweep", 0. ), ( "lean", 0. ) )
+
+stackingPoints = ( "centroid", "leadingEdge", "trailingEdge" )
+
+# binary STL facet: normal, three vertices, attribute byte count
+stlType = numpy.dtype( [ ( 'normal', '<f4', 3 ), ( 'vertices', '<f4', ( 3, 3 ) ), ( 'attribute', '<u2' ) ] )
+
+
+
+
+def spanSchedules( schedules, percentSpan ):
+   '''evaluates the schedules of a blade at percentSpan, the span fraction
+      from 0 at the hub to 1 at the tip, as BladeGeometry tables are
+
+      schedules    {socket or variable name: schedule}, e.g. S_CHORDvR or
+                   chord; missing BladeGeometry sockets take their *_in
+                   value, chord_in etc. override those
+
+      returns {variable: array} of the BladeGeometry variables and of
+      camber, sweep and lean; aqc is NaN, the thickness series' own maximum
+      thickness location, unless S_THK_LOCqCvR, aqc or aqc_in is given
+   '''
+
+   values = {}
+   for socket, name, default in geometrySockets:
+      if name == "aqc":
+         default = None
+      default = schedules.get( name + "_in", default )
+      values[name] = evaluateSchedule( schedules.get( socket, schedules.get( name ) ), percentSpan,
+                                       numpy.nan if default is None else default )
+   for name, default in sectionSchedules:
+      values[name] = evaluateSchedule( schedules.get( name ), percentSpan, default )
+   return values
+
+
+
+
+def sectionLoops( values, npts=250, thkProfile="Aseries", clustering="cosine" ):
+   '''builds the section of every span station in one batch
+
+      values       spanSchedules of the stations
+      npts         points on each surface
+
+      the thickness series is stretched so its maximum is at aqc, and the
+      trailing edge thickness is added growing linearly with chord fraction
+      from the leading edge.  Returns the closed section outlines, (K, M, 2)
+      axial and tangential x, y running along the suction surface from the
+      leading edge and back along the pressure surface; the last pressure
+      point is left out when every trailing edge is sharp, so no point
+      repeats
+   '''
+
+   chord = values['chord']
+   thicknessToChord = values['thicknessToChord']
+   if numpy.any( thicknessToChord <= 0. ) or numpy.any( chord <= 0. ):
+      raise ValueError( "sections need a positive chord and thicknessToChord at every station" )
+
+   # the built-in thickness series are tabulated for their own maximum
+   # thickness, half of it on each side of the camber line
+   distribution = airfoilGeometry.thicknessSeries[thkProfile]
+   maxTqC = thicknessToChord/( 2.*distribution.thickness.max() )
+   seriesLocation = distribution.x[ numpy.argmax( distribution.thickness ) ]
+   aqc = numpy.where( numpy.isnan( values['aqc'] ), seriesLocation, values['aqc'] )
+   if numpy.any( ( aqc <= 0. ) | ( aqc >= 1. ) ):
+      raise ValueError( "the maximum thickness location aqc must be between 0 and 1" )
+
+   K = len(chord)
+   family = airfoilGeometry.getCamberFamily( "circularArc" )
+   params, K = family.prepare( { 'turns': values['camber'][:,None], 'relLengs': numpy.ones( ( K, 1 ) ) }, K )
+   turns, relLengs = family.pieces( params )
+   t = airfoilGeometry.pointDistribution( turns, relLengs, npts, clustering, maxTqC[:,None], thkProfile )
+   xCL, yCL, angle = airfoilGeometry.camberLines( family, params, values['staggerAngle']/c_DEGtoRAD, chord, 0., 0., t )
+
+   # chord fraction of each point, mapped so aqc lands on the series maximum
+   x = t[:,0]
+   aqc = aqc[:,None]
+   xSeries = numpy.where( x <= aqc, x/aqc*seriesLocation,
+                          seriesLocation + ( x - aqc )/( 1. - aqc )*( 1. - seriesLocation ) )
+   thick = ( maxTqC*chord )[:,None]*distribution( xSeries ) + 0.5*values['TEthickness'][:,None]*x
+
+   xUS, yUS, xLS, yLS = airfoilGeometry.offsetSurfaces( xCL, yCL, angle, numpy.where( turns < 0, -1., 1. ), thick[:,None] )
+   suction = numpy.stack( ( xUS[:,0], yUS[:,0] ), axis=-1 )
+   pressure = numpy.stack( ( xLS[:,0], yLS[:,0] ), axis=-1 )
+
+   if numpy.any( values['TEthickness'] > 0. ):
+      return numpy.concatenate( ( suction, pressure[:,:0:-1] ), axis=1 )
+   return numpy.concatenate( ( suction, pressure[:,-2:0:-1] ), axis=1 )
+
+
+
+
+def stackingOffsets( loops, stacking="centroid" ):
+   '''returns the point of each section that lies on the stacking axis,
+      (K, 2): the area centroid, the leading edge or the trailing edge'''
+
+   if stacking == "leadingEdge":
+      return loops[:,0]
+   if stacking == "trailingEdge":
+      return loops[:,( loops.shape[1] + 1 )//2 - 1]
+   if stacking != "centroid":
+      raise ValueError( "unknown stacking point '%s', use one of %s" % ( stacking, ", ".join( stackingPoints ) ) )
+
+   # shoelace formula over each closed outline
+   x, y = loops[...,0], loops[...,1]
+   xNext, yNext = numpy.roll( x, -1, axis=1 ), numpy.roll( y, -1, axis=1 )
+   cross = x*yNext - xNext*y
+   area = cross.sum( axis=1 )/2.
+   return numpy.column_stack( ( ( ( x + xNext )*cross ).sum( axis=1 )/( 6.*area ),
+                                ( ( y + yNext )*cross ).sum( axis=1 )/( 6.*area ) ) )
+
+
+
+
+def wrap( loops, radius, axial=0. ):
+   '''wraps blade to blade outlines onto cylinders; x is axial and y the
+      tangential arc length at each station's radius.  Returns (K, M, 3)
+      points with x axial, z radial at zero angle and y tangential'''
+
+   radius = numpy.asarray( radius, dtype=float )[:,None]
+   theta = loops[...,1]/radius
+   points = numpy.empty( loops.shape[:2] + ( 3, ) )
+   points[...,0] = loops[...,0] + axial
+   points[...,1] = radius*numpy.sin( theta )
+   points[...,2] = radius*numpy.cos( theta )
+   return points
+
+
+
+
+def surfaceFaces( K, M, sharp ):
+   '''returns the triangles, (F, 3) vertex indices, of the closed surface of
+      K stacked outlines of M points: quads between neighbouring outlines
+      and, at the hub and tip, strips joining the suction and pressure
+      points at the same chord position'''
+
+   k = numpy.arange( K - 1 )[:,None]*M
+   i = numpy.arange( M )[None,:]
+   iNext = ( i + 1 ) % M
+   a, b, c, d = k + i, k + iNext, k + M + iNext, k + M + i
+   sides = numpy.concatenate( ( numpy.stack( ( a, b, c ), axis=-1 ).reshape( -1, 3 ),
+                                numpy.stack( ( a, c, d ), axis=-1 ).reshape( -1, 3 ) ) )
+
+   # outline positions of the suction and pressure point of each chord
+   # position, the leading edge (and a sharp trailing edge) being shared
+   nSurface = ( M + 2 )//2 if sharp else ( M + 1 )//2
+   j = numpy.arange( nSurface )
+   suction = j
+   pressure = numpy.where( j == 0, 0, M - j )
+   if sharp:
+      pressure[-1] = suction[-1]
+   quads = numpy.column_stack( ( suction[:-1], suction[1:], pressure[1:], pressure[:-1] ) )
+   cap = numpy.concatenate( ( quads[:,[0,1,2]], quads[:,[0,2,3]] ) )
+   cap = cap[ ( cap[:,0] != cap[:,1] ) & ( cap[:,1] != cap[:,2] ) & ( cap[:,0] != cap[:,2] ) ]
+
+   # the hub cap faces inward of the outline direction, the tip cap outward
+   return numpy.concatenate( ( sides, cap[:,::-1], cap + ( K - 1 )*M ) )
+
+
+
+
+class Blade( object ):
+   '''closed triangulated surface of one blade
+
+      vertices     (V, 3) points, x axial, y tangential, z radial at zero
+                   blade angle, in
+      faces        (F, 3) vertex indices, outward normals by the right hand
+                   rule
+      percentSpan  span fraction of each outline, 0 at the hub to 1 at the
+                   tip as percentLEspan; outline k holds vertices k*M to
+                   (k+1)*M
+   '''
+
+   __slots__ = ( 'vertices', 'faces', 'percentSpan' )
+
+   def __init__( self, vertices, faces, percentSpan ):
+      self.vertices = vertices
+      self.faces = faces
+      self.percentSpan = percentSpan
+
+   def volume( self ):
+      '''enclosed volume, in3, positive for outward facing triangles'''
+      p = self.vertices[self.faces]
+      return numpy.einsum( 'ij,ij->i', p[:,0], numpy.cross( p[:,1], p[:,2] ) ).sum()/6.
+
+   def rotated( self, angle ):
+      '''returns the vertices turned by angle (rad) about the x axis'''
+      cosAngle, sinAngle = numpy.cos( angle ), numpy.sin( angle )
+      vertices = self.vertices.copy()
+      vertices[:,1] = cosAngle*self.vertices[:,1] + sinAngle*self.vertices[:,2]
+      vertices[:,2] = -sinAngle*self.vertices[:,1] + cosAngle*self.vertices[:,2]
+      return vertices
+
+
+
+
+def stackBlade( schedules, rHub, rTip, spanStations=21, npts=250, thkProfile="Aseries",
+                clustering="cosine", stacking="centroid", axial=0. ):
+   '''evaluates the spanwise schedules at spanStations equally spaced
+      stations from hub to tip, builds the sections in one batch, stacks
+      them on the stacking axis (through the section "centroid",
+      "leadingEdge" or "trailingEdge", moved by the sweep and lean
+      schedules), wraps them onto their radius and closes the surface
+
+      schedules    {socket or variable name: schedule}, see spanSchedules;
+                   stagger is in rad as in BladeGeometry, camber in deg
+      rHub, rTip   hub and tip radius of the stacking axis, in
+      npts         points on each surface of a section
+      axial        axial position of the stacking axis, in
+
+      returns a Blade
+   '''
+
+   percentSpan = numpy.linspace( 0., 1., spanStations )
+   values = spanSchedules( schedules, percentSpan )
+   loops = sectionLoops( values, npts, thkProfile, clustering )
+
+   offsets = stackingOffsets( loops, stacking )
+   loops = loops - offsets[:,None,:]
+   loops[...,0] += values['sweep'][:,None]
+   loops[...,1] += values['lean'][:,None]
+
+   radius = rHub + percentSpan*( rTip - rHub )
+   points = wrap( loops, radius, axial )
+   K, M = points.shape[:2]
+   faces = surfaceFaces( K, M, sharp=not numpy.any( values['TEthickness'] > 0. ) )
+
+   blade = Blade( points.reshape( -1, 3 ), faces, percentSpan )
+   if blade.volume() < 0.:
+      blade.faces = faces[:,::-1].copy()
+   return blade
+
+
+
+
+def writeSTL( fname, blade, numberOfBlades=1, name="OTAC blade" ):
+   '''writes the blade, or numberOfBlades copies of it equally spaced about
+      the axis, as binary STL; the facets of one blade at a time are held
+      in memory, so whole rows stay within a blade's worth of memory'''
+
+   facets = numpy.zeros( len(blade.faces), dtype=stlType )
+   with open( fname, "wb" ) as f:
+      f.write( name.encode()[:80].ljust( 80, b" " ) )
+      f.write( numpy.array( [ len(blade.faces)*numberOfBlades ], dtype='<u4' ).tobytes() )
+      for n in range( numberOfBlades ):
+         p = blade.rotated( 2.*numpy.pi*n/numberOfBlades )[blade.faces]
+         normal = numpy.cross( p[:,1] - p[:,0], p[:,2] - p[:,0] )
+         length = numpy.sqrt( ( normal**2 ).sum( axis=1 ) )[:,None]
+         facets['normal'] = normal/numpy.where( length > 0., length, 1. )
+         facets['vertices'] = p
+         facets.tofile( f )
+
+
+
+
+def readSTL( fname ):
+   '''reads a binary STL; returns the (F, 3, 3) facet vertices and normals'''
+
+   with open( fname, "rb" ) as f:
+      f.seek( 80 )
+      count = int( numpy.fromfile( f, dtype='<u4', count=1 )[0] )
+      facets = numpy.fromfile( f, dtype=stlType, count=count )
+   return facets['vertices'], facets['normal']
+
+
+
+
+def saveBlade( fname, blade, numberOfBlades=1 ):
+   '''writes a blade as .npz: one blade's vertices and faces and the number
+      of blades of the row they are repeated for'''
+
+   numpy.savez( fname, vertices=blade.vertices, faces=blade.faces.astype( numpy.int32 ),
+                percentSpan=blade.percentSpan, numberOfBlades=numberOfBlades )
+
+
+
+
+def loadBlade( fname ):
+   '''reads a blade written by saveBlade; returns the Blade and the number
+      of blades of its row'''
+
+   data = numpy.load( fname )
+   blade = Blade( data['vertices'], data['faces'].astype( numpy.intp ), data['percentSpan'] )
+   return blade, int( data['numberOfBlades'] )
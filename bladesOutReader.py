@@ -0,0 +1,145 @@
+#
+# =============================================================================
+#          PYTHON READER FOR OTAC BLADE ROW VELOCITY TRIANGLE FILES
+#                      (.bladesOut FILES WRITTEN BY outputVT)
+#
+# =============================================================================
+
+
+import glob
+import os
+import re
+
+import numpy
+
+
+# a blade row is written as   name = { 'field': value, ... }
+# followed by the list of blade rows   BRnames = [ name, name, ]
+# values are strings, numbers, or lists with one number per stream
+blockPattern = re.compile( r"(\w+)\s*=\s*\{(.*?)\}", re.DOTALL )
+fieldPattern = re.compile( r"'(\w+)'\s*:\s*('[^']*'|\[[^\]]*\]|[^,\n]+)" )
+namesPattern = re.compile( r"BRnames\s*=\s*\[(.*?)\]", re.DOTALL )
+
+
+
+def parseValue( text ):
+   '''returns a quoted value as a string, a list as a float array, and
+      anything else as a float'''
+
+   text = text.strip()
+   if text.startswith( "'" ):
+      return text[1:-1]
+   if text.startswith( "[" ):
+      return numpy.array( [ float( value ) for value in text[1:-1].split( "," ) if value.strip() ] )
+   return float( text )
+
+
+
+
+def parseBladesOut( text ):
+   '''parses the text of a .bladesOut file into a structured array with one
+      row per blade row and one field per dictionary entry'''
+
+   rows = {}
+   for match in blockPattern.finditer( text ):
+      rows[ match.group(1) ] = dict( ( key, parseValue( value ) )
+                                     for key, value in fieldPattern.findall( match.group(2) ) )
+
+   # rows are ordered as in BRnames when the list is present
+   names = namesPattern.search( text )
+   if names is None:
+      order = list( rows )
+   else:
+      order = [ name.strip() for name in names.group(1).split( "," ) if name.strip() ]
+      missing = [ name for name in order if name not in rows ]
+      if missing:
+         raise ValueError( "BRnames lists undefined blade rows: " + ", ".join( missing ) )
+
+   if not order:
+      return numpy.zeros( 0, dtype=[ ( 'bladerowName', 'U1' ) ] )
+
+   # the first blade row sets the fields; strings are sized to their longest
+   # entry and stream lists to the most streams, padded with NaN
+   fields = list( rows[ order[0] ] )
+   dtype = []
+   for key in fields:
+      if isinstance( rows[ order[0] ][key], str ):
+         width = max( len( rows[name][key] ) for name in order )
+         dtype.append( ( key, 'U%d' % max( width, 1 ) ) )
+      elif isinstance( rows[ order[0] ][key], numpy.ndarray ):
+         width = max( len( rows[name][key] ) for name in order )
+         dtype.append( ( key, 'f8', ( width, ) ) )
+      else:
+         dtype.append( ( key, 'f8' ) )
+
+   table = numpy.zeros( len(order), dtype=dtype )
+   for key in fields:
+      if table.dtype[key].shape:
+         table[key] = numpy.nan
+         for row, name in enumerate( order ):
+            table[key][ row, :len( rows[name][key] ) ] = rows[name][key]
+      else:
+         table[key] = [ rows[name][key] for name in order ]
+
+   return table
+
+
+
+
+def readBladesOut( fname ):
+   '''reads a .bladesOut file written by outputVT in elements/OTAC.fnc
+
+      returns a structured array with one row per blade row; each field
+      ('velocityIn', 'alphaIn', 'betaOut', ...) is a NumPy column, and each
+      row can be indexed like the dictionaries in the file.  Fields written
+      per stream hold one value per stream, hub to tip
+   '''
+
+   with open( fname ) as f:
+      return parseBladesOut( f.read() )
+
+
+
+
+def readBladesOutDir( dirname, pattern="*.bladesOut" ):
+   '''reads every .bladesOut file in a directory into one structured array
+
+      the leading 'case' field holds the file name without its extension;
+      all the files must hold the same fields
+   '''
+
+   cases = []
+   tables = []
+   for fname in sorted( glob.glob( os.path.join( dirname, pattern ) ) ):
+      table = readBladesOut( fname )
+      if len(table):
+         cases.append( os.path.splitext( os.path.basename( fname ) )[0] )
+         tables.append( table )
+   if not tables:
+      return numpy.zeros( 0, dtype=[ ( 'case', 'U1' ) ] )
+
+   caseWidth = max( len(case) for case in cases )
+
+   # strings take the widest entry and stream lists the most streams of any file
+   dtype = [ ( 'case', 'U%d' % caseWidth ) ]
+   for key in tables[0].dtype.names:
+      types = [ table.dtype[key] for table in tables ]
+      dtype.append( ( key, max( types, key=lambda t: t.itemsize ) ) )
+
+   combined = numpy.zeros( sum( len(table) for table in tables ), dtype=dtype )
+   for key in combined.dtype.names:
+      if combined.dtype[key].shape:
+         combined[key] = numpy.nan
+
+   row = 0
+   for case, table in zip( cases, tables ):
+      block = combined[ row:row+len(table) ]
+      block['case'] = case
+      for key in table.dtype.names:
+         if table.dtype[key].shape:
+            block[key][ :, :table.dtype[key].shape[0] ] = table[key]
+         else:
+            block[key] = table[key]
+      row += len(table)
+
+   return combined
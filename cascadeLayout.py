@@ -0,0 +1,123 @@
+#
+# =============================================================================
+#          CASCADE AND BLADE ROW LAYOUT
+#                      (ONE SECTION PER ROW, PLACED AT EVERY PITCH AND ROW
+#                       POSITION BY TRANSLATION, ONE LineCollection PER ROW)
+#
+# =============================================================================
+
+
+import numpy
+from matplotlib.collections import LineCollection
+
+import airfoilGeometry
+
+
+
+
+def rowPositions( axialChord, gap, xStart=0. ):
+   '''returns the axial leading edge position of each row of a machine from
+      the axial chord of each row and the gap behind each (a scalar for
+      every gap)'''
+
+   axialChord = numpy.asarray( axialChord, dtype=float )
+   gap = numpy.broadcast_to( numpy.asarray( gap, dtype=float ), axialChord.shape )
+   return xStart + numpy.concatenate( ( [ 0. ], numpy.cumsum( axialChord + gap )[:-1] ) )
+
+
+
+
+def rowSections( turns, relLengs, maxTqC, thkProfile, staggerAngle, chord, npts=101, clustering="uniform" ):
+   '''builds the section of each row once, in one genAirfoils batch, with
+      its leading edge at the origin; arguments are those of genAirfoils,
+      one row per section.  Returns (rows, 3, npts*narcs, 2) camber,
+      suction and pressure points.'''
+
+   turns = numpy.atleast_2d( numpy.asarray( turns, dtype=float ) )
+   coords = airfoilGeometry.genAirfoils( turns, relLengs, maxTqC, thkProfile, staggerAngle, chord,
+                                         numpy.zeros( ( len(turns), 2 ) ), npts, clustering )
+   return coords.transpose( 1, 0, 2, 3 )
+
+
+
+
+class Cascade( object ):
+   '''blades of several rows, each a copy of its row's section moved to its
+      leading edge position
+
+      sections     (rows, 3, npts, 2) section of each row at the origin
+      offsets      (blades, 2) leading edge position of each blade
+      rows         row of each blade
+      coords       (blades, 3, npts, 2) shared buffer of every blade's
+                   camber, suction and pressure points
+   '''
+
+   __slots__ = ( 'sections', 'offsets', 'rows', 'coords' )
+
+   def __init__( self, sections, offsets, rows ):
+      self.sections = sections
+      self.offsets = offsets
+      self.rows = rows
+      self.coords = numpy.empty( ( len(rows), ) + sections.shape[1:] )
+      self.place()
+
+   def place( self ):
+      '''moves every blade to its offset; a new layout of the same blades,
+         e.g. another gap, only changes offsets before calling this'''
+      numpy.add( self.sections[self.rows], self.offsets[:,None,None,:], out=self.coords )
+
+   def row( self, r ):
+      '''returns the (blades, 3, npts, 2) points of row r'''
+      return self.coords[ self.rows == r ]
+
+
+
+
+def layoutCascade( sections, numberOfBlades, radius, axial, passages=3, surfaces=( 1, 2 ) ):
+   '''places the sections of each row at passages pitches around its
+      leading edge position
+
+      sections         rowSections of each row
+      numberOfBlades   blade count of each row
+      radius           radius of each row's sections, in; the pitch is
+                       2*pi*radius/numberOfBlades
+      axial            axial leading edge position of each row, e.g. from
+                       rowPositions
+      passages         blades drawn in each row, centered on y = 0
+      surfaces         section curves kept: 0 camber, 1 suction, 2 pressure
+
+      returns a Cascade
+   '''
+
+   sections = numpy.asarray( sections, dtype=float )[:,list( surfaces )]
+   nRows = len(sections)
+   pitch = 2.*numpy.pi*numpy.broadcast_to( numpy.asarray( radius, dtype=float ), ( nRows, ) ) \
+           /numpy.broadcast_to( numpy.asarray( numberOfBlades, dtype=float ), ( nRows, ) )
+   axial = numpy.broadcast_to( numpy.asarray( axial, dtype=float ), ( nRows, ) )
+
+   rows = numpy.repeat( numpy.arange( nRows ), passages )
+   blade = numpy.tile( numpy.arange( passages ) - ( passages - 1 )/2., nRows )
+   offsets = numpy.column_stack( ( axial[rows], blade*pitch[rows] ) )
+   return Cascade( sections, offsets, rows )
+
+
+
+
+def plotCascade( cascade, axes, colors=None ):
+   '''draws each row of a cascade as a single LineCollection; returns the
+      collections, which can be updated with set_segments'''
+
+   nRows = len(cascade.sections)
+   if colors is None:
+      colors = [ 'red' if r % 2 == 0 else 'cyan' for r in range( nRows ) ]
+
+   collections = []
+   for r in range( nRows ):
+      points = cascade.row( r )
+      collection = LineCollection( points.reshape( ( -1, ) + points.shape[2:] ), colors=colors[r] )
+      axes.add_collection( collection )
+      collections.append( collection )
+
+   axes.autoscale_view()
+   axes.set_aspect( 'equal', adjustable='datalim' )
+   return collections
@@ -0,0 +1,380 @@
+#
+# =============================================================================
+#          VECTORIZED MEANLINE BLADE SEGMENT
+#                      (EULER WORK, PRESSURE RATIO, EFFICIENCY AND LOSS OF
+#                       BladeSegment.calculate FOR SWEEPS OF DESIGNS)
+#
+# =============================================================================
+
+
+import numpy
+
+from velocityTriangles import triangles
+
+GRAVITY = 32.174         # lbm ft / lbf s2
+JOULES_CONST = 778.169   # ft lbf / BTU
+R_UNIVERSAL = 1.98588    # BTU / lbmol R
+
+# loss bases of BladeRow switchLossBasis
+lossBases = ( "PTOT", "PTOTREL", "EFF", "TURBINE", "TURBINE_ALT" )
+
+
+
+class IdealGas( object ):
+   '''calorically perfect gas: constant cp (BTU/lbm R) and gas constant R
+      (BTU/lbm R); h = cp*T'''
+
+   __slots__ = ( 'cp', 'R' )
+
+   def __init__( self, cp=0.24, R=0.068564 ):
+      self.cp = cp
+      self.R = R
+
+   def h( self, T ):
+      return self.cp*T
+
+   def T( self, h ):
+      return h/self.cp
+
+   def Cp( self, T ):
+      return self.cp + 0.*T
+
+   def phi( self, T ):
+      '''entropy function, integral of cp/T'''
+      return self.cp*numpy.log( T )
+
+
+
+
+class PerfectAir( object ):
+   '''thermally perfect dry air, mole fraction weighted NASA 7 coefficient
+      polynomials of N2, O2, Ar and CO2 (valid 360-10800 R).  Enthalpies
+      have the NASA reference, not the Janaf one, so only differences
+      compare with NPSS output; without dissociation and fuel, cp is within
+      about 0.2% of Janaf air.'''
+
+   __slots__ = ( 'R', 'low', 'high' )
+
+   # ( molecular weight, mole fraction, 1000-6000 K, 200-1000 K coefficients )
+   species = (
+      ( 28.0134, 0.78084,
+        ( 2.92664000e+00, 1.48797680e-03, -5.68476000e-07, 1.00970380e-10, -6.75335100e-15, -9.22797700e+02, 5.98052800e+00 ),
+        ( 3.29867700e+00, 1.40824040e-03, -3.96322200e-06, 5.64151500e-09, -2.44485400e-12, -1.02089990e+03, 3.95037200e+00 ) ),
+      ( 31.9988, 0.209476,
+        ( 3.28253784e+00, 1.48308754e-03, -7.57966669e-07, 2.09470555e-10, -2.16717794e-14, -1.08845772e+03, 5.45323129e+00 ),
+        ( 3.78245636e+00, -2.99673416e-03, 9.84730201e-06, -9.68129509e-09, 3.24372837e-12, -1.06394356e+03, 3.65767573e+00 ) ),
+      ( 39.948, 0.00934,
+        ( 2.5, 0., 0., 0., 0., -7.45375000e+02, 4.36600000e+00 ),
+        ( 2.5, 0., 0., 0., 0., -7.45375000e+02, 4.36600000e+00 ) ),
+      ( 44.0095, 0.000314,
+        ( 3.85746029e+00, 4.41437026e-03, -2.21481404e-06, 5.23490188e-10, -4.72084164e-14, -4.87591660e+04, 2.27163806e+00 ),
+        ( 2.35677352e+00, 8.98459677e-03, -7.12356269e-06, 2.45919022e-09, -1.43699548e-13, -4.83719697e+04, 9.90105222e+00 ) ),
+   )
+
+   def __init__( self ):
+
+      moles = sum( weight*fraction for weight, fraction, high, low in self.species )
+      self.R = R_UNIVERSAL/moles
+      self.high = sum( fraction*numpy.array( high ) for weight, fraction, high, low in self.species )
+      self.low = sum( fraction*numpy.array( low ) for weight, fraction, high, low in self.species )
+
+   def coefficients( self, T ):
+      '''returns the kelvin temperature and the polynomial coefficients of
+         each T, one array per coefficient'''
+      TK = numpy.asarray( T )/1.8
+      hot = TK > 1000.
+      return TK, [ numpy.where( hot, high, low ) for high, low in zip( self.high, self.low ) ]
+
+   def Cp( self, T ):
+      TK, a = self.coefficients( T )
+      return self.R*( a[0] + TK*( a[1] + TK*( a[2] + TK*( a[3] + TK*a[4] ) ) ) )
+
+   def h( self, T ):
+      TK, a = self.coefficients( T )
+      return self.R*1.8*( TK*( a[0] + TK*( a[1]/2. + TK*( a[2]/3. + TK*( a[3]/4. + TK*a[4]/5. ) ) ) ) + a[5] )
+
+   def phi( self, T ):
+      '''entropy function, integral of cp/T'''
+      TK, a = self.coefficients( T )
+      return self.R*( a[0]*numpy.log( TK ) + TK*( a[1] + TK*( a[2]/2. + TK*( a[3]/3. + TK*a[4]/4. ) ) ) + a[6] )
+
+   def T( self, h ):
+      '''temperature of enthalpy h, by Newton iteration'''
+
+      T = 1000. + 0.*h
+      for iteration in range( 50 ):
+         TK, a = self.coefficients( T )
+         cp = a[0] + TK*( a[1] + TK*( a[2] + TK*( a[3] + TK*a[4] ) ) )
+         hT = TK*( a[0] + TK*( a[1]/2. + TK*( a[2]/3. + TK*( a[3]/4. + TK*a[4]/5. ) ) ) ) + a[5]
+         dT = 1.8*( hT - h/( 1.8*self.R ) )/cp
+         T = T - dT
+         if not numpy.any( abs(dT) >= 1e-9*T ):
+            break
+      return T
+
+
+air = PerfectAir()
+
+
+
+
+def pressureRatio( gas, T1, T2 ):
+   '''isentropic pressure ratio P2/P1 between temperatures T1 and T2'''
+   return numpy.exp( ( gas.phi( T2 ) - gas.phi( T1 ) )/gas.R )
+
+
+
+
+def isentropicTemperature( gas, T1, PR ):
+   '''temperature at pressure ratio PR on the isentrope through T1'''
+
+   target = gas.phi( T1 ) + gas.R*numpy.log( PR )
+   T = T1*PR**( gas.R/gas.Cp( T1 ) )
+   for iteration in range( 50 ):
+      dT = ( gas.phi( T ) - target )*T/gas.Cp( T )
+      T = T - dT
+      if not numpy.any( abs(dT) >= 1e-9*T ):
+         break
+   return T
+
+
+
+
+def flowState( gas, ht, Pt, V, Vrel, Tt=None ):
+   '''returns the static temperature, enthalpy and pressure, the relative
+      total pressure and the density of a station; the pressures and density
+      are proportional to Pt'''
+
+   hs = ht - V**2/( 2.*GRAVITY*JOULES_CONST )
+   Ts = gas.T( hs )
+   if Tt is None:
+      Tt = gas.T( ht )
+   Ps = Pt*pressureRatio( gas, Tt, Ts )
+   TtRel = gas.T( hs + Vrel**2/( 2.*GRAVITY*JOULES_CONST ) )
+   PtRel = Ps*pressureRatio( gas, Ts, TtRel )
+   rhos = Ps*144./( gas.R*JOULES_CONST*Ts )
+   MN = V/numpy.sqrt( gas.Cp( Ts )/( gas.Cp( Ts ) - gas.R )*gas.R*JOULES_CONST*GRAVITY*Ts )
+
+   return { 'Tt': Tt, 'Ts': Ts, 'hs': hs, 'Ps': Ps, 'TtRel': TtRel, 'PtRel': PtRel, 'rhos': rhos,
+            'MN': MN, 'MNrel': MN*Vrel/V }
+
+
+
+
+def segmentExit( gas, inlet, flowIn, radiusOut, Nmech, betaOut, VzOut, VrOut, rotating, loss, lossBasis ):
+   '''returns the exit state of segments for an exit axial velocity'''
+
+   Vm = numpy.hypot( VzOut, VrOut )
+   omega = numpy.where( rotating, Nmech*numpy.pi/30., 0. )
+   Vtheta = omega*radiusOut/12. - Vm*numpy.tan( betaOut )
+   exit = triangles( radiusOut, Nmech, VzOut, Vtheta, VrOut, rotating )
+
+   # Euler work and rothalpy, BTU/lbm
+   work = ( exit['U']*exit['Vtheta'] - inlet['U']*inlet['Vtheta'] )/( GRAVITY*JOULES_CONST )
+   ht = flowIn['ht'] + work
+   Tt = gas.T( ht )
+   PRideal = pressureRatio( gas, flowIn['Tt'], Tt )
+
+   # exit static and relative totals scale with the exit total pressure
+   flow = flowState( gas, ht, 1., exit['Vflow'], exit['Vrel'], Tt )
+   Ps, PtRel = flow['Ps'], flow['PtRel']
+   rothalpyIn = flowIn['ht'] - inlet['U']*inlet['Vtheta']/( GRAVITY*JOULES_CONST )
+   rothalpyOut = ht - exit['U']*exit['Vtheta']/( GRAVITY*JOULES_CONST )
+   PtRothIn = flowIn['Pt']*pressureRatio( gas, flowIn['Tt'], gas.T( rothalpyIn ) )
+   PtRoth = pressureRatio( gas, Tt, gas.T( rothalpyOut ) )
+   dynamicIn = flowIn['Pt'] - flowIn['Ps']
+   dynamicRelIn = flowIn['PtRel'] - flowIn['Ps']
+
+   # exit total pressure that gives the loss on its basis
+   if lossBasis == "PTOT":
+      Pt = flowIn['Pt'] - loss*dynamicIn
+   elif lossBasis == "PTOTREL":
+      Pt = PRideal*flowIn['Pt'] - loss*dynamicRelIn/PtRel
+   elif lossBasis == "TURBINE":
+      Pt = PtRothIn/( PtRoth + loss*( PtRel - Ps ) )
+   elif lossBasis == "TURBINE_ALT":
+      Pt = flowIn['PtRel']/( PtRel + loss*( PtRel - Ps ) )
+   else:
+      turbine = ht < flowIn['ht']
+      with numpy.errstate( divide='ignore', invalid='ignore' ):
+         hIdeal = numpy.where( turbine, flowIn['ht'] - ( flowIn['ht'] - ht )/loss,
+                                        flowIn['ht'] + loss*( ht - flowIn['ht'] ) )
+      hIdeal = numpy.where( rotating & ( ht != flowIn['ht'] ), hIdeal, ht )
+      Pt = flowIn['Pt']*pressureRatio( gas, flowIn['Tt'], gas.T( hIdeal ) )
+
+   flow.update( { 'Ps': Pt*Ps, 'PtRel': Pt*PtRel, 'rhos': Pt*flow['rhos'], 'ht': ht, 'Pt': Pt, 'work': work, 'PRideal': PRideal, 'PtRothIn': PtRothIn,
+                  'PtRothOut': Pt*PtRoth } )
+   return exit, flow
+
+
+
+
+def exitVelocity( args, rest, W, areaOut, branch="subsonic", maxIterations=60 ):
+   '''returns the exit axial velocity that passes the flow W through areaOut
+
+      with the exit swirl set by the blade, the flow through the exit has a
+      maximum (near exit relative Mach 1 for rotors); the velocity is found
+      on the chosen side of it by bracketing, so every segment takes the
+      same number of passes
+   '''
+
+   if branch not in ( "subsonic", "supersonic" ):
+      raise ValueError( "unknown continuity branch: " + str( branch ) )
+
+   gas, flowIn = args[0], args[2]
+
+   # velocities that expand the flow below a fifth of the inlet temperature
+   # pass no flow, which also keeps the gas inside its fitted range
+   hFloor = gas.h( 0.2*flowIn['Tt'] )
+
+   def flow( Vz ):
+      with numpy.errstate( divide='ignore', invalid='ignore', over='ignore' ):
+         exit, state = segmentExit( *( args + ( Vz, ) + rest ) )
+         return numpy.where( state['hs'] > hFloor, state['rhos']*Vz*areaOut/144., 0. )
+
+   # an upper bound past the largest flow, where the exit passes none,
+   # doubling from the velocity that passes the flow at the inlet total density
+   rho = flowIn['Pt']*144./( gas.R*JOULES_CONST*flowIn['Tt'] )
+   high = W*144./( rho*areaOut ) + 0.*flowIn['Tt']
+   for iteration in range( 12 ):
+      grow = flow( high ) > 0.
+      if not numpy.any( grow ):
+         break
+      high = numpy.where( grow, 2.*high, high )
+
+   # golden section search for the largest flow
+   golden = ( numpy.sqrt( 5. ) - 1. )/2.
+   a, b = 0.*high, high
+   c, d = b - golden*( b - a ), a + golden*( b - a )
+   fc, fd = flow( c ), flow( d )
+   for iteration in range( maxIterations//3 ):
+      left = fc > fd
+      a, b = numpy.where( left, a, c ), numpy.where( left, d, b )
+      c, d = numpy.where( left, b - golden*( b - a ), d ), numpy.where( left, c, a + golden*( b - a ) )
+      fNew = flow( numpy.where( left, c, d ) )
+      fc, fd = numpy.where( left, fNew, fd ), numpy.where( left, fc, fNew )
+   peak = ( a + b )/2.
+
+   # regula falsi (Illinois) for the flow on the chosen side
+   if branch == "subsonic":
+      lo, hi = 0.*peak, peak
+   else:
+      lo, hi = peak, high
+   flo, fhi = flow( lo ) - W, flow( hi ) - W
+   for iteration in range( maxIterations ):
+      with numpy.errstate( divide='ignore', invalid='ignore' ):
+         V = numpy.where( fhi != flo, hi - fhi*( hi - lo )/( fhi - flo ), ( lo + hi )/2. )
+      V = numpy.clip( V, numpy.minimum( lo, hi ), numpy.maximum( lo, hi ) )
+      fV = flow( V ) - W
+      sameSide = numpy.sign( fV ) == numpy.sign( fhi )
+      lo, flo = numpy.where( sameSide, lo, hi ), numpy.where( sameSide, flo/2., fhi )
+      hi, fhi = V, fV
+      if not numpy.any( abs(fV) >= 1e-12*W ):
+         break
+
+   return numpy.where( flow( peak ) >= W, V, numpy.nan )
+
+
+
+
+def bladeSegments( TtIn, PtIn, VzIn, VthetaIn, radiusIn, radiusOut, Nmech, bladeExitAngle,
+                   VzOut=None, W=None, areaOut=None, deviation=0., switchBladeAngleSign="POSITIVE",
+                   rotating=True, loss=None, lossBasis="PTOT", gas=air, VrIn=0., VrOut=0.,
+                   branch="subsonic", maxIterations=60 ):
+   '''evaluates the work, pressure ratio, efficiency and loss of blade
+      segments, as BladeSegment.calculate does once its solver converges
+
+      TtIn, PtIn          inlet total temperature (R) and pressure (psia)
+      VzIn, VthetaIn, VrIn   inlet absolute velocities, ft/s
+      radiusIn, radiusOut    segment inlet and exit radius, in
+      Nmech               shaft speed, rpm
+      bladeExitAngle      exit metal angle, rad, with deviation (rad) and
+                          switchBladeAngleSign as in BladeSegment
+      VzOut               exit axial velocity, ft/s; or W (lbm/s) and
+                          areaOut (in2) to find it from continuity, on the
+                          "subsonic" or "supersonic" side of the largest
+                          flow the exit passes (branch); segments that
+                          cannot pass W return NaN.  The turbine points of
+                          test_2stgCRturbine.viewOut are on the supersonic
+                          side: the subsonic default gives rotor1 VzOut 661
+                          ft/s and PR 0.638, the page 714.5 and 0.6095
+      rotating            False for stators (switchRotate "NON_ROTATING")
+      loss                loss on the lossBasis of BladeRow switchLossBasis
+                          ("PTOT", "PTOTREL", "EFF", "TURBINE",
+                          "TURBINE_ALT"); isentropic on every basis when
+                          None
+      gas                 air (thermally perfect) or an IdealGas
+
+      the inputs broadcast against each other.  Returns a dictionary of
+      arrays: the page columns PR, PRideal, segmentEff, lossActual, EulerDh
+      (the 'Euler dh' column, (htOut - htIn)*g*J/1000) and EulerUVt (the
+      'Euler U_Vt' column, change of U*Vtheta/1000), the other loss
+      parameters, and the exit flow (TtOut, PtOut, PsOut, ...).
+   '''
+
+   if lossBasis not in lossBases:
+      raise ValueError( "unknown loss basis: " + str( lossBasis ) )
+   if isinstance( rotating, str ):
+      rotating = rotating == "ROTATING"
+   rotating = numpy.asarray( rotating, dtype=bool )
+   # no loss is isentropic on every basis; a PTOT loss of zero would hold
+   # the total pressure of rotors, whose work changes it
+   exitBasis = lossBasis
+   if loss is None:
+      loss, exitBasis = 0., "PTOTREL"
+
+   ( TtIn, PtIn, VzIn, VthetaIn, radiusIn, radiusOut, Nmech, bladeExitAngle, deviation, loss, VrIn,
+     VrOut ) = [ numpy.asarray( value, dtype=float ) for value in
+      ( TtIn, PtIn, VzIn, VthetaIn, radiusIn, radiusOut, Nmech, bladeExitAngle, deviation, loss, VrIn, VrOut ) ]
+   VzOut, W, areaOut = [ None if value is None else numpy.asarray( value, dtype=float )
+                         for value in ( VzOut, W, areaOut ) ]
+
+   positive = numpy.asarray( switchBladeAngleSign ) == "POSITIVE"
+   betaOut = numpy.where( positive, -bladeExitAngle + deviation, -bladeExitAngle - deviation )
+
+   inlet = triangles( radiusIn, Nmech, VzIn, VthetaIn, VrIn, rotating )
+   flowIn = flowState( gas, gas.h( TtIn + 0.*inlet['U'] ), 1., inlet['Vflow'], inlet['Vrel'] )
+   for name in ( 'Ps', 'PtRel', 'rhos' ):
+      flowIn[name] = flowIn[name]*PtIn
+   flowIn.update( { 'ht': gas.h( flowIn['Tt'] ), 'Pt': PtIn + 0.*flowIn['Tt'] } )
+
+   args = ( gas, inlet, flowIn, radiusOut, Nmech, betaOut )
+   rest = ( VrOut, rotating, loss, exitBasis )
+
+   if VzOut is None:
+      if W is None or areaOut is None:
+         raise ValueError( "exit needs VzOut, or W and areaOut" )
+      VzOut = exitVelocity( args, rest, W, areaOut, branch, maxIterations )
+
+   # loss parameters of BladeSegment, NaN where the exit passes no flow
+   with numpy.errstate( divide='ignore', invalid='ignore', over='ignore' ):
+      exit, flow = segmentExit( *( args + ( VzOut, ) + rest ) )
+
+      PtLossActual = ( flowIn['Pt'] - flow['Pt'] )/( flowIn['Pt'] - flowIn['Ps'] )
+      PtLossTurb_alt = ( flowIn['PtRel'] - flow['PtRel'] )/( flow['PtRel'] - flow['Ps'] )
+      PtLossTurb = ( flow['PtRothIn'] - flow['PtRothOut'] )/( flow['PtRel'] - flow['Ps'] )
+      PtIdeal = flow['PRideal']*flowIn['Pt']
+      omegaBar = ( PtIdeal*flow['PtRel']/flow['Pt'] - flow['PtRel'] )/( flowIn['PtRel'] - flowIn['Ps'] )
+
+      dh = flow['ht'] - flowIn['ht']
+      dhIdeal = gas.h( isentropicTemperature( gas, flowIn['Tt'], flow['Pt']/flowIn['Pt'] ) ) - flowIn['ht']
+      segmentEff = numpy.where( dh > 0., dhIdeal/dh, dh/dhIdeal )
+   segmentEff = numpy.where( rotating, segmentEff, 1. )
+
+   lossActual = { "PTOT": PtLossActual, "PTOTREL": omegaBar, "TURBINE": PtLossTurb,
+                  "TURBINE_ALT": PtLossTurb_alt, "EFF": segmentEff }[ lossBasis ]
+   Umean = ( inlet['U'] + exit['U'] )/2.
+
+   with numpy.errstate( divide='ignore', invalid='ignore' ):
+      return { 'PR': flow['Pt']/flowIn['Pt'], 'PRideal': flow['PRideal'], 'segmentEff': segmentEff,
+               'lossActual': lossActual, 'PtLossActual': PtLossActual, 'PtLossTurb': PtLossTurb,
+               'PtLossTurb_alt': PtLossTurb_alt, 'omegaBar': omegaBar,
+               'EulerDh': dh*GRAVITY*JOULES_CONST/1000.,
+               'EulerUVt': ( exit['U']*exit['Vtheta'] - inlet['U']*inlet['Vtheta'] )/1000.,
+               'flowCoefficient': inlet['Vm']/inlet['U'],
+               'loadingCoefficient': abs(dh)*GRAVITY*JOULES_CONST/Umean**2,
+               'TtOut': flow['Tt'], 'PtOut': flow['Pt'], 'htOut': flow['ht'], 'TsOut': flow['Ts'],
+               'PsOut': flow['Ps'], 'PtRelOut': flow['PtRel'], 'MNout': flow['MN'], 'MNrelOut': flow['MNrel'],
+               'VzOut': exit['Vz'], 'VthetaOut': exit['Vtheta'], 'UOut': exit['U'], 'alphaOut': exit['alpha'],
+               'betaOut': exit['beta'], 'PsIn': flowIn['Ps'], 'PtRelIn': flowIn['PtRel'], 'MNin': flowIn['MN'],
+               'MNrelIn': flowIn['MNrel'], 'UIn': inlet['U'], 'betaIn': inlet['beta'] }
@@ -0,0 +1,291 @@
+#
+# =============================================================================
+#          PYTHON EVALUATION OF NPSS TABLES
+#                      (Table DEFINITIONS READ FROM .int AND .run FILES)
+#
+# =============================================================================
+
+
+import re
+
+import numpy
+
+
+# tokens of a Table definition; comments are removed first
+commentPattern = re.compile( r"//[^\n]*|/\*.*?\*/", re.DOTALL )
+tokenPattern = re.compile( r'"[^"]*"|[A-Za-z_][\w.]*|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|[{}()=*;,]' )
+identifier = re.compile( r"[A-Za-z_][\w.]*$" )
+
+interpMethods = ( "linear", "spline" )
+extrapMethods = ( "linear", "none" )
+
+
+
+def splineMatrix( knots ):
+   '''returns the matrix giving the second derivatives of a natural cubic
+      spline through the knots from the values at the knots'''
+
+   n = len(knots)
+   h = numpy.diff( knots )
+   A = numpy.eye( n )
+   R = numpy.zeros( ( n, n ) )
+   for i in range( 1, n-1 ):
+      A[i,i-1:i+2] = h[i-1]/6., ( h[i-1] + h[i] )/3., h[i]/6.
+      R[i,i-1:i+2] = 1./h[i-1], -1./h[i-1] - 1./h[i], 1./h[i]
+
+   return numpy.linalg.solve( A, R )
+
+
+
+
+class TableAxis( object ):
+   '''one independent variable of a table: its knots and, for the last
+      variable, the interval coefficients of the values; otherwise the
+      tables of the remaining variables at each knot'''
+
+   __slots__ = ( 'knots', 'step', 'interp', 'extrap', 'spline', 'coefficients', 'children' )
+
+   def __init__( self, knots, values=None, children=None, interp="linear", extrap="linear" ):
+
+      if interp not in interpMethods:
+         raise ValueError( "unknown table interpolation: " + str( interp ) )
+      if extrap not in extrapMethods:
+         raise ValueError( "unknown table extrapolation: " + str( extrap ) )
+
+      knots = numpy.asarray( knots, dtype=float )
+      order = numpy.argsort( knots )
+      self.knots = knots[order]
+      if numpy.any( numpy.diff( self.knots ) <= 0. ):
+         raise ValueError( "table knots must be distinct" )
+
+      # uniform knots are located by division instead of a search
+      h = numpy.diff( self.knots )
+      self.step = h[0] if len(h) and numpy.allclose( h, h[0], rtol=1e-9, atol=0. ) else None
+
+      self.interp = interp
+      self.extrap = extrap
+      self.spline = splineMatrix( self.knots ) if interp == "spline" and len(self.knots) > 2 else None
+
+      if children is not None:
+         self.children = [ children[i] for i in order ]
+         self.coefficients = None
+      else:
+         self.children = None
+         self.coefficients = self.fit( numpy.asarray( values, dtype=float )[order] )
+
+   def fit( self, values ):
+      '''returns the cubic coefficients of each interval, shape (4, n-1, ...)'''
+
+      if len(self.knots) == 1:
+         return numpy.array( [ values, 0.*values, 0.*values, 0.*values ] )
+
+      h = numpy.diff( self.knots ).reshape( (-1,) + (1,)*( values.ndim - 1 ) )
+      slope = numpy.diff( values, axis=0 )/h
+      if self.spline is None:
+         zero = numpy.zeros_like( slope )
+         return numpy.array( [ values[:-1], slope, zero, zero ] )
+
+      m = numpy.tensordot( self.spline, values, 1 )
+      return numpy.array( [ values[:-1], slope - h*( 2.*m[:-1] + m[1:] )/6.,
+                            m[:-1]/2., ( m[1:] - m[:-1] )/( 6.*h ) ] )
+
+   def locate( self, x ):
+      '''returns the interval of each x and its offset into the interval'''
+
+      knots = self.knots
+      if len(knots) == 1:
+         return numpy.zeros( numpy.shape( x ), dtype=int ), 0.*x
+      if self.extrap == "none":
+         x = numpy.clip( x, knots[0], knots[-1] )
+
+      if self.step is not None:
+         i = numpy.floor( ( x - knots[0] )/self.step ).astype( int )
+      else:
+         i = numpy.searchsorted( knots, x, side='right' ) - 1
+      i = numpy.clip( i, 0, len(knots) - 2 )
+
+      return i, x - knots[i]
+
+   def evaluate( self, x ):
+      '''evaluates the table at the tuple of broadcast arrays x'''
+
+      i, u = self.locate( x[0] )
+      if self.children is None:
+         c = self.coefficients[ :, i ]
+      else:
+         values = numpy.array( [ child.evaluate( x[1:] ) for child in self.children ] )
+         c = numpy.take_along_axis( self.fit( values ), i[None,None], 1 )[:,0]
+
+      # past the end knots, continue the end value along the end slope
+      v = u
+      if len(self.knots) > 1:
+         v = numpy.clip( u, 0., self.knots[i+1] - self.knots[i] )
+      value = ( ( c[3]*v + c[2] )*v + c[1] )*v + c[0]
+      return value + ( u - v )*( ( 3.*c[3]*v + 2.*c[2] )*v + c[1] )
+
+
+
+
+class Table( object ):
+   '''an NPSS Table of one or more independent variables
+
+      calling the table with one array per independent variable, in the
+      order of the definition, returns the interpolated values broadcast
+      over the arrays.  Interpolation is "linear" or "spline" (natural
+      cubic) and extrapolation "linear" (a straight line from the end knots
+      along the end derivative of the interpolation) or "none" (holds the
+      end values), set per table as in NPSS.
+   '''
+
+   __slots__ = ( 'name', 'args', 'output', 'root' )
+
+   def __init__( self, name, args, output, root ):
+      self.name = name
+      self.args = args
+      self.output = output
+      self.root = root
+
+   def __call__( self, *x ):
+
+      if len(x) != len(self.args):
+         raise ValueError( "%s takes %d arguments" % ( self.name, len(self.args) ) )
+      x = numpy.broadcast_arrays( *[ numpy.asarray( value, dtype=float ) for value in x ] )
+      return self.root.evaluate( x )
+
+   def __repr__( self ):
+      return "Table %s( %s ) -> %s" % ( self.name, ", ".join( self.args ), self.output )
+
+
+
+
+def makeTable( name, xName, x, yName, y, interp="linear", extrap="linear" ):
+   '''creates a 1-D table from arrays, as BladeRow.saveDesignBladeAngles does'''
+
+   return Table( name, [ xName ], yName, TableAxis( x, y, interp=interp, extrap=extrap ) )
+
+
+
+
+def parseList( tokens, pos ):
+   '''reads a { value, value, ... } list starting at tokens[pos]'''
+
+   end = tokens.index( "}", pos )
+   return [ float( token ) for token in tokens[ pos+1:end ] if token != "," ], end + 1
+
+
+
+
+def parseBlock( tokens, pos, args, level, previous, interp, extrap ):
+   '''reads the body of a table or of one of its sub-tables up to its closing
+      brace; returns the axis, the position after the brace, the arrays it
+      defined (for '*' in the next sub-table) and its output name'''
+
+   arrays = {}
+   knots = []
+   children = []
+   childArrays = previous
+   output = None
+
+   while tokens[pos] != "}":
+      name = tokens[pos]
+      if tokens[pos+1] != "=":
+         raise ValueError( "unexpected '%s' in table definition" % name )
+      pos += 2
+      token = tokens[pos]
+
+      if token == "{":
+         arrays[name], pos = parseList( tokens, pos )
+      elif token == "*":
+         if previous is None or name not in previous:
+            raise ValueError( "'%s = *' has no previous values" % name )
+         arrays[name] = previous[name]
+         pos += 1
+      elif token.startswith( '"' ):
+         if name == "interp":
+            interp = token[1:-1]
+         elif name == "extrap":
+            extrap = token[1:-1]
+         pos += 1
+      elif name == args[level] and tokens[pos+1] == "{":
+         knots.append( float( token ) )
+         child, pos, childArrays, output = parseBlock( tokens, pos+2, args, level+1, childArrays, interp, extrap )
+         children.append( child )
+      else:
+         # other attributes of the table are not needed here
+         pos += 1
+
+      if tokens[pos] == ";":
+         pos += 1
+
+   if children:
+      return TableAxis( knots, children=children, interp=interp, extrap=extrap ), pos+1, arrays, output
+
+   if args[level] not in arrays:
+      raise ValueError( "table has no values for " + args[level] )
+   outputs = [ name for name in arrays if name != args[level] ]
+   if len(outputs) != 1:
+      raise ValueError( "table needs one output array, found " + ", ".join( outputs ) )
+   output = outputs[0]
+   if len( arrays[output] ) != len( arrays[ args[level] ] ):
+      raise ValueError( "%s and %s have different lengths" % ( args[level], output ) )
+
+   axis = TableAxis( arrays[ args[level] ], arrays[output], interp=interp, extrap=extrap )
+   return axis, pos+1, arrays, output
+
+
+
+
+def parseTables( text, interp="linear", extrap="linear" ):
+   '''returns every Table defined in NPSS source text, keyed by its full
+      name through the objects it is defined in, e.g. "rotor1.S_INPUTvR"
+      or "rotor1.S_Geometry.S_CHORDvR"; tables of class definitions are
+      keyed by their own name.  Raises ValueError when a full name is
+      defined twice.'''
+
+   tokens = tokenPattern.findall( commentPattern.sub( "", text ) )
+   tables = {}
+   path = []
+
+   pos = 0
+   while pos < len(tokens):
+      token = tokens[pos]
+
+      if token == "Table" and pos + 2 < len(tokens) and tokens[pos+2] == "(":
+         name = tokens[pos+1]
+         end = tokens.index( ")", pos )
+         args = [ token for token in tokens[ pos+3:end ] if token not in ( "real", "," ) ]
+         if tokens[end+1] != "{":
+            pos = end + 1
+            continue
+
+         root, pos, arrays, output = parseBlock( tokens, end+2, args, 0, None, interp, extrap )
+         fullName = ".".join( [ block for block in path if block is not None ] + [ name ] )
+         if fullName in tables:
+            raise ValueError( "table %s is defined more than once" % fullName )
+         tables[fullName] = Table( fullName, args, output, root )
+         continue
+
+      # "Type name {" opens an object; class bodies, functions, conditions
+      # and value lists add nothing to the names
+      if token == "{":
+         named = pos >= 2 and all( identifier.match( tokens[k] ) for k in ( pos-2, pos-1 ) ) \
+                 and tokens[pos-2] not in ( "class", "extends" )
+         path.append( tokens[pos-1] if named else None )
+      elif token == "}" and path:
+         path.pop()
+      pos += 1
+
+   return tables
+
+
+
+
+def loadTables( fname, interp="linear", extrap="linear" ):
+   '''reads every Table defined in an NPSS .int, .run or .fnc file
+
+      tables = loadTables( "elements/OTACLossModel_AinleyMathieson1951.int" )
+      tables["TB_YpNozzle"]( alpha2, pitchToChord )
+   '''
+
+   with open( fname ) as f:
+      return parseTables( f.read(), interp, extrap )
@@ -0,0 +1,221 @@
+#
+# =============================================================================
+#          STREAMLINE SIMPLE RADIAL EQUILIBRIUM SOLVER
+#                      (STANDALONE VERSION OF THE BladeRow dep_RadEq AND
+#                       dep_Rhub EqRtip DEPENDENTS)
+#
+# =============================================================================
+
+
+import numpy
+import scipy.linalg
+
+GRAVITY = 32.174    # lbm ft / lbf s2
+
+# unknowns are ordered Ps_1, r_1, Ps_2, r_2, ... Ps_N, so each residual only
+# depends on the unknowns at most this far away
+bandWidth = 2
+
+
+
+class RadialEquilibrium( object ):
+   '''simple radial equilibrium of N streams between a hub and tip radius
+
+      the unknowns are the static pressure of each stream and the radii
+      between streams; the residuals are the mass flow of each stream and,
+      between neighbouring streams, the BladeRow radial equilibrium
+
+         (1/rho) dPs/dr = Vtheta^2/r - correction
+
+      evaluated across the two stream centers as BladeRow does for its hub
+      and tip streams.
+   '''
+
+   __slots__ = ( 'rHub', 'rTip', 'W', 'Pt', 'Tt', 'swirl', 'gamma', 'R', 'correction' )
+
+   def __init__( self, rHub, rTip, W, Pt, Tt, swirl, gamma=1.4, R=53.35, correction=0. ):
+
+      self.rHub = float( rHub )
+      self.rTip = float( rTip )
+      self.W = numpy.asarray( W, dtype=float )
+      nStreams = len(self.W)
+      self.Pt = numpy.broadcast_to( numpy.asarray( Pt, dtype=float ), ( nStreams, ) )
+      self.Tt = numpy.broadcast_to( numpy.asarray( Tt, dtype=float ), ( nStreams, ) )
+      self.swirl = swirl
+      self.gamma = gamma
+      self.R = R
+      self.correction = numpy.broadcast_to( numpy.asarray( correction, dtype=float ), ( max( nStreams-1, 0 ), ) )
+
+      if self.rTip <= self.rHub:
+         raise ValueError( "tip radius must be larger than hub radius" )
+
+   def staticState( self, Ps, Vtheta ):
+      '''returns the isentropic static temperature, density, velocities and
+         Mach number of streams at static pressures Ps'''
+
+      g = self.gamma
+      Ts = self.Tt*( Ps/self.Pt )**( ( g - 1. )/g )
+      V2 = numpy.maximum( 2.*g/( g - 1. )*self.R*GRAVITY*( self.Tt - Ts ), 0. )
+      Vz = numpy.sqrt( numpy.maximum( V2 - Vtheta**2, 1e-6 ) )
+      rhos = Ps*144./( self.R*Ts )
+
+      return { 'Ts': Ts, 'rhos': rhos, 'Vz': Vz, 'Vflow': numpy.sqrt( V2 ),
+               'MN': numpy.sqrt( V2/( g*self.R*GRAVITY*Ts ) ) }
+
+   def streams( self, x ):
+      '''returns the stream radii, mean radii, areas, swirl and static state
+         of the unknowns x'''
+
+      Ps = x[0::2]
+      radii = numpy.concatenate( ( [ self.rHub ], x[1::2], [ self.rTip ] ) )
+      radius = ( radii[:-1] + radii[1:] )/2.
+      area = numpy.pi*( radii[1:]**2 - radii[:-1]**2 )/144.
+
+      Vtheta = self.swirl( radius ) if callable( self.swirl ) else numpy.asarray( self.swirl, dtype=float )
+      Vtheta = numpy.broadcast_to( Vtheta, Ps.shape )
+
+      result = self.staticState( Ps, Vtheta )
+      result.update( { 'radii': radii, 'radius': radius, 'area': area, 'Ps': Ps, 'Vtheta': Vtheta } )
+      return result
+
+   def residuals( self, x ):
+      '''returns the mass flow and radial equilibrium errors, interleaved as x'''
+
+      s = self.streams( x )
+      mass = s['rhos']*s['Vz']*s['area']/self.W - 1.
+
+      # pressure force against centripetal acceleration across stream centers, ft2/s2
+      dr = s['radius'][1:] - s['radius'][:-1]
+      rMean = ( s['radius'][1:] + s['radius'][:-1] )/2.
+      VthetaMean = ( s['Vtheta'][1:] + s['Vtheta'][:-1] )/2.
+      pressure = ( s['Ps'][1:] - s['Ps'][:-1] )*144.*GRAVITY*2./( s['rhos'][1:] + s['rhos'][:-1] )
+      centripetal = VthetaMean**2*dr/rMean - self.correction*GRAVITY*dr/12.
+      # scaled by the two streams only, to keep the Jacobian banded
+      scale = ( ( s['Vflow'][1:] + s['Vflow'][:-1] )/2. )**2 + 1.
+      radEq = ( pressure - centripetal )/scale
+
+      F = numpy.empty( len(x) )
+      F[0::2] = mass
+      F[1::2] = radEq
+      return F
+
+   def jacobian( self, x, F ):
+      '''returns the banded Jacobian of the residuals in solve_banded form,
+         from 2*bandWidth+1 perturbations of interleaved unknowns'''
+
+      n = len(x)
+      step = 1e-7*numpy.maximum( abs(x), 1. )
+      ab = numpy.zeros( ( 2*bandWidth + 1, n ) )
+      for color in range( 2*bandWidth + 1 ):
+         columns = numpy.arange( color, n, 2*bandWidth + 1 )
+         xp = x.copy()
+         xp[columns] += step[columns]
+         dF = self.residuals( xp ) - F
+         for k in range( -bandWidth, bandWidth + 1 ):
+            rows = columns + k
+            valid = ( rows >= 0 ) & ( rows < n )
+            ab[ bandWidth + k, columns[valid] ] = dF[ rows[valid] ]/step[ columns[valid] ]
+
+      return ab
+
+   def guess( self ):
+      '''returns stream radii that give each stream the share of the annulus
+         it needs at its choked flow per area, and the subsonic static
+         pressure that passes each stream's flow through that area; raises
+         ValueError when the whole annulus cannot pass the total flow'''
+
+      nStreams = len(self.W)
+      psRatio = numpy.linspace( 0.999, 0.53, 500 )[:,None]
+      x = numpy.empty( 2*nStreams - 1 )
+      x[0::2] = self.Pt
+
+      # choked flow per area of each stream, at the swirl of flow share radii
+      share = numpy.cumsum( self.W )[:-1]/self.W.sum()
+      x[1::2] = numpy.sqrt( self.rHub**2 + share*( self.rTip**2 - self.rHub**2 ) )
+      state = self.staticState( self.Pt*psRatio, self.streams( x )['Vtheta'] )
+      needed = self.W/( state['rhos']*state['Vz'] ).max( axis=0 )
+      annulus = numpy.pi*( self.rTip**2 - self.rHub**2 )/144.
+      if needed.sum() >= annulus:
+         raise ValueError( "flow exceeds choked flow of the annulus (%g > %g lbm/s)" %
+                           ( self.W.sum(), self.W.sum()*annulus/needed.sum() ) )
+
+      share = numpy.cumsum( needed )[:-1]/needed.sum()
+      x[1::2] = numpy.sqrt( self.rHub**2 + share*( self.rTip**2 - self.rHub**2 ) )
+      s = self.streams( x )
+
+      # first ratio, from the total pressure down, that passes the flow; the
+      # choked ratio where the swirl at the new radii passes a little less
+      state = self.staticState( self.Pt*psRatio, s['Vtheta'] )
+      mass = state['rhos']*state['Vz']*s['area']
+      passes = mass >= self.W
+      first = numpy.where( passes.any( axis=0 ), numpy.argmax( passes, axis=0 ), numpy.argmax( mass, axis=0 ) )
+      x[0::2] = self.Pt*psRatio[first,0]
+      return x
+
+   def solve( self, x=None, tolerance=1e-10, maxIterations=50 ):
+      '''Newton iteration with a banded Jacobian from the guess x (or the
+         default guess); returns the stream state with the iteration count'''
+
+      if x is None:
+         x = self.guess()
+      F = self.residuals( x )
+      norm = numpy.max( abs(F) )
+
+      iteration = 0
+      while norm > tolerance:
+         if iteration == maxIterations:
+            raise ValueError( "radial equilibrium did not converge, residual %g" % norm )
+         iteration += 1
+
+         dx = scipy.linalg.solve_banded( ( bandWidth, bandWidth ), self.jacobian( x, F ), -F )
+
+         # backtrack while the radii cross, a static pressure leaves (0, Pt)
+         # or the residual grows
+         fraction = 1.
+         while True:
+            xNew = x + fraction*dx
+            radii = numpy.concatenate( ( [ self.rHub ], xNew[1::2], [ self.rTip ] ) )
+            Ps = xNew[0::2]
+            if numpy.all( numpy.diff( radii ) > 0. ) and numpy.all( Ps > 0. ) and numpy.all( Ps < self.Pt ):
+               FNew = self.residuals( xNew )
+               normNew = numpy.max( abs(FNew) )
+               if normNew < norm:
+                  break
+            fraction /= 2.
+            if fraction < 1e-6:
+               raise ValueError( "radial equilibrium step failed, residual %g; a stream may be choked" % norm )
+
+         x, F, norm = xNew, FNew, normNew
+
+      result = self.streams( x )
+      result['iterations'] = iteration
+      result['x'] = x
+      return result
+
+
+
+
+def solveRadialEquilibrium( rHub, rTip, W, Pt, Tt, swirl, gamma=1.4, R=53.35, correction=0.,
+                            tolerance=1e-10, maxIterations=50 ):
+   '''returns stream radii and static pressures in simple radial equilibrium
+
+      rHub, rTip   annulus hub and tip radius, in
+      W            mass flow of each stream, hub to tip, lbm/s
+      Pt, Tt       total pressure (psia) and temperature (R), scalars or one
+                   per stream
+      swirl        Vtheta of each stream, ft/s, or a function of the stream
+                   mean radius returning Vtheta (e.g. a free vortex
+                   lambda r: K/r)
+      gamma, R     ideal gas ratio of specific heats and gas constant,
+                   ft lbf/(lbm R)
+      correction   BladeRow bladeREcorr between each pair of streams
+
+      returns a dictionary with the stream boundary 'radii' (N+1) and the
+      'radius', 'area', 'Ps', 'Ts', 'rhos', 'Vz', 'Vtheta', 'Vflow' and 'MN'
+      of each stream; raises ValueError when the annulus cannot pass the
+      total flow, or when no step of the Newton iteration reduces the
+      residuals, e.g. a stream choked by the swirl
+   '''
+
+   model = RadialEquilibrium( rHub, rTip, W, Pt, Tt, swirl, gamma, R, correction )
+   return model.solve( tolerance=tolerance, maxIterations=maxIterations )
@@ -0,0 +1,92 @@
+#
+# =============================================================================
+#          HEADLESS BATCH RENDERER FOR VELOCITY TRIANGLE PLOTS
+#
+# =============================================================================
+
+
+# python renderVelocityTriangles.py -o plots -j 8 -f png,svg test_output/*.bladesOut
+
+
+import argparse
+import glob
+import multiprocessing
+import os
+
+# render off screen, so this has to come before pylab is imported
+import matplotlib
+matplotlib.use( "Agg" )
+import pylab
+
+from bladesOutReader import readBladesOut
+from velocityTriangleView import VelocityTriangleView
+
+
+
+def renderFile( fname, outdir, formats=( "png", ) ):
+   '''writes one plot per blade row of a .bladesOut file to outdir, named
+      <case>_<bladerowName>.<format>, and returns the written file names'''
+
+   case = os.path.splitext( os.path.basename( fname ) )[0]
+   written = []
+
+   # one figure per file, updated for each blade row
+   view = VelocityTriangleView()
+   for BR in readBladesOut( fname ):
+      view.update( BR )
+      for fmt in formats:
+         outname = os.path.join( outdir, "%s_%s.%s" % ( case, BR['bladerowName'], fmt ) )
+         view.figure.savefig( outname, format=fmt, facecolor=view.figure.get_facecolor() )
+         written.append( outname )
+   pylab.close( view.figure )
+
+   return written
+
+
+
+
+def renderJob( job ):
+   '''renders one file of a batch in a worker process'''
+   return renderFile( *job )
+
+
+
+
+def renderBatch( fnames, outdir, formats=( "png", ), workers=None ):
+   '''renders every blade row of every .bladesOut file in fnames
+
+      files are spread over a pool of worker processes (all the cores when
+      workers is None); workers=1 renders in this process
+   '''
+
+   if not os.path.isdir( outdir ):
+      os.makedirs( outdir )
+   jobs = [ ( fname, outdir, tuple( formats ) ) for fname in fnames ]
+
+   if workers == 1 or len(jobs) < 2:
+      return [ outname for job in jobs for outname in renderJob( job ) ]
+
+   pool = multiprocessing.Pool( workers )
+   try:
+      written = pool.map( renderJob, jobs, chunksize=1 )
+   finally:
+      pool.close()
+      pool.join()
+
+   return [ outname for files in written for outname in files ]
+
+
+
+
+if __name__ == "__main__":
+
+   parser = argparse.ArgumentParser( description="render velocity triangle plots of .bladesOut files" )
+   parser.add_argument( "files", nargs="+", help=".bladesOut files or glob patterns" )
+   parser.add_argument( "-o", "--outdir", default=".", help="output directory" )
+   parser.add_argument( "-f", "--formats", default="png", help="comma separated image formats (png,svg,...)" )
+   parser.add_argument( "-j", "--workers", type=int, default=None, help="worker processes, all cores by default" )
+   args = parser.parse_args()
+
+   fnames = sorted( set( fname for pattern in args.files for fname in glob.glob( pattern ) ) )
+   written = renderBatch( fnames, args.outdir, args.formats.split( "," ), args.workers )
+   print( "wrote %d plots from %d files" % ( len(written), len(fnames) ) )
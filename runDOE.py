@@ -0,0 +1,219 @@
+#
+# =============================================================================
+#          PARALLEL DESIGN OF EXPERIMENTS DRIVER
+#                      (RUN FILE VARIANTS FROM A TEMPLATE AND A PARAMETER
+#                       TABLE, ONE WORKING DIRECTORY PER CASE)
+#
+# =============================================================================
+
+
+# python runDOE.py -t test_2stgCRturbine.run -p map.csv -o doe -j 64 -e /path/to/npss.nt.exe
+#
+# map.csv has one column per variable and one row per case, e.g.
+#
+#    case,start.W,rotorShaft1.Nmech,rotorShaft2.Nmech
+#    w30,3.0,38000.,-38000.
+#    w35,3.5,38000.,-38000.
+
+
+import argparse
+import csv
+import multiprocessing
+import os
+import re
+import subprocess
+import time
+
+from npssTables import commentPattern
+
+
+# ${name} in a template is replaced by the value of name for each case
+placeholderPattern = re.compile( r"\$\{([\w.]+)\}" )
+runPattern = re.compile( r"^[ \t]*run\(\s*\)\s*;", re.MULTILINE )
+
+# quoted output files written by the run files, their directories are
+# created in each case directory
+outputPathPattern = re.compile( r'(?:filename\s*=|outputVT\s*\()\s*"([^"]+)"' )
+
+outputPatterns = ( ".viewOut", ".bladesOut", ".out" )
+
+# the solver, e.g. the npss.nt.exe run_npss.bat starts
+defaultExecutable = os.environ.get( "NPSS_EXE", "npss" )
+repoDir = os.path.dirname( os.path.abspath( __file__ ) )
+
+resultFields = ( "case", "status", "returncode", "seconds", "directory", "outputs" )
+
+
+
+
+def readParameters( fname ):
+   '''reads a csv parameter table; returns the case names and a list of
+      {variable: value} dictionaries, values kept as written'''
+
+   with open( fname ) as f:
+      rows = [ row for row in csv.DictReader( f ) if any( row.values() ) ]
+
+   names = []
+   cases = []
+   for i, row in enumerate( rows ):
+      name = row.pop( "case", None ) or "case%04d" % i
+      names.append( name )
+      cases.append( dict( ( key.strip(), value.strip() ) for key, value in row.items() ) )
+
+   if len( set( names ) ) != len(names):
+      raise ValueError( "case names in %s are not unique" % fname )
+   return names, cases
+
+
+
+
+def renderRunFile( template, values ):
+   '''returns the template with ${name} replaced by values[name]; variables
+      without a placeholder are set just before the last run() that is not
+      commented out, i.e. at the operating point the template ends on'''
+
+   missing = set( placeholderPattern.findall( template ) ) - set( values )
+   if missing:
+      raise ValueError( "no value for " + ", ".join( sorted( missing ) ) )
+
+   text = placeholderPattern.sub( lambda m: values[ m.group(1) ], template )
+   used = set( placeholderPattern.findall( template ) )
+   assignments = [ name for name in values if name not in used ]
+   if not assignments:
+      return text
+
+   comments = [ m.span() for m in commentPattern.finditer( text ) ]
+   runs = [ m.start() for m in runPattern.finditer( text )
+            if not any( start <= m.start() < end for start, end in comments ) ]
+   if not runs:
+      raise ValueError( "template has no run() to set " + ", ".join( assignments ) )
+
+   newline = "\r\n" if "\r\n" in text else "\n"
+   block = "".join( "%s = %s;%s" % ( name, values[name], newline ) for name in assignments )
+   return text[:runs[-1]] + block + text[runs[-1]:]
+
+
+
+
+def findOutputs( directory ):
+   '''returns the output files written in a case directory'''
+
+   found = []
+   for path, dirs, files in os.walk( directory ):
+      found.extend( os.path.join( path, fname ) for fname in sorted( files )
+                    if fname.endswith( outputPatterns ) )
+   return found
+
+
+
+
+def runCase( job ):
+   '''runs one case in its own directory; returns its result row
+
+      status is "ok", "failed" (non-zero return code), "timeout" or "error"
+      (the executable could not be started); the solver output is kept in
+      npss.log in the case directory
+   '''
+
+   name, directory, runFile, command, timeout = job
+
+   start = time.time()
+   returncode = None
+   with open( os.path.join( directory, "npss.log" ), "w" ) as log:
+      try:
+         returncode = subprocess.call( command + [ runFile ], cwd=directory, stdout=log,
+                                       stderr=subprocess.STDOUT, timeout=timeout )
+         status = "ok" if returncode == 0 else "failed"
+      except subprocess.TimeoutExpired:
+         status = "timeout"
+      except OSError as error:
+         log.write( str( error ) + "\n" )
+         status = "error"
+
+   return { 'case': name, 'status': status, 'returncode': returncode,
+            'seconds': time.time() - start, 'directory': directory,
+            'outputs': findOutputs( directory ) }
+
+
+
+
+def runDOE( template, names, cases, outdir, executable=defaultExecutable, args=(),
+            workers=None, timeout=None, includes=( repoDir, ) ):
+   '''renders and runs every case of a design of experiments
+
+      template     text of the .run file the cases are made from
+      names        case names, also the case directory names under outdir
+      cases        {variable: value} of each case
+      executable   solver command, a path or a list of the command and its
+                   first arguments; a script taking the run file as its
+                   last argument can stand in for NPSS
+      args         more arguments, before the run file
+      workers      cases run at once (all the cores when None)
+      timeout      seconds before a case is killed, no limit when None
+      includes     directories passed as -I so the #include files resolve
+                   from the case directories
+
+      returns the result rows in case order, which are also written to
+      outdir/results.csv as the cases finish
+   '''
+
+   if isinstance( executable, str ):
+      executable = [ executable ]
+   command = list( executable ) + [ arg for path in includes for arg in ( "-I", path ) ] + list( args )
+
+   jobs = []
+   for name, values in zip( names, cases ):
+      directory = os.path.abspath( os.path.join( outdir, name ) )
+      text = renderRunFile( template, values )
+      for path in [ "" ] + outputPathPattern.findall( text ):
+         path = os.path.join( directory, os.path.dirname( path.replace( "\\", "/" ) ) )
+         if not os.path.isdir( path ):
+            os.makedirs( path )
+      with open( os.path.join( directory, name + ".run" ), "w", newline="" ) as f:
+         f.write( text )
+      jobs.append( ( name, directory, name + ".run", command, timeout ) )
+
+   results = {}
+   summary = open( os.path.join( outdir, "results.csv" ), "w", newline="" )
+   writer = csv.DictWriter( summary, resultFields )
+   writer.writeheader()
+
+   # the workers only wait on the solver processes, so the pool size is the
+   # number of solvers running at once
+   pool = multiprocessing.Pool( workers )
+   try:
+      for result in pool.imap_unordered( runCase, jobs, chunksize=1 ):
+         results[ result['case'] ] = result
+         writer.writerow( dict( result, outputs=";".join( result['outputs'] ) ) )
+         summary.flush()
+   finally:
+      pool.close()
+      pool.join()
+      summary.close()
+
+   return [ results[name] for name in names ]
+
+
+
+
+if __name__ == "__main__":
+
+   parser = argparse.ArgumentParser( description="run a design of experiments from a .run template" )
+   parser.add_argument( "-t", "--template", required=True, help=".run file with ${variable} placeholders" )
+   parser.add_argument( "-p", "--parameters", required=True, help="csv table, one column per variable" )
+   parser.add_argument( "-o", "--outdir", default="doe", help="directory for the case directories" )
+   parser.add_argument( "-e", "--executable", default=defaultExecutable, help="solver executable" )
+   parser.add_argument( "-j", "--workers", type=int, default=None, help="cases run at once, all cores by default" )
+   parser.add_argument( "--timeout", type=float, default=None, help="seconds per case" )
+   args = parser.parse_args()
+
+   with open( args.template, newline="" ) as f:
+      template = f.read()
+   names, cases = readParameters( args.parameters )
+
+   results = runDOE( template, names, cases, args.outdir, args.executable,
+                     workers=args.workers, timeout=args.timeout )
+   counts = {}
+   for result in results:
+      counts[ result['status'] ] = counts.get( result['status'], 0 ) + 1
+   print( ", ".join( "%d %s" % ( counts[status], status ) for status in sorted( counts ) ) )
@@ -0,0 +1,184 @@
+#
+# =============================================================================
+#          SMITH CHARTS OF SWEEP RESULTS
+#                      (EFFICIENCY AGAINST FLOW AND LOADING COEFFICIENT OF
+#                       EVERY ROTOR SEGMENT, REPLACES smith_plot.m)
+#
+# =============================================================================
+
+
+# python smithChart.py -o smith.png doe/*/test_output/*.viewOut
+# python smithChart.py -o smith.png --model test_output/test_2stgCRturbine.viewOut
+
+
+import argparse
+import glob
+
+import matplotlib
+import numpy
+import pylab
+import scipy.interpolate
+
+from viewOutReader import readPages
+
+smithType = numpy.dtype( [ ( 'label', 'U64' ), ( 'page', 'i4' ), ( 'row', 'U32' ), ( 'segment', 'U64' ),
+                           ( 'phi', 'f8' ), ( 'psi', 'f8' ), ( 'eff', 'f8' ), ( 'W', 'f8' ) ] )
+
+defaultLevels = numpy.arange( 0.80, 0.96, 0.01 )
+stageMarkers = ( 'o', 's', '^', 'D', 'v', 'P', 'X', '*' )
+
+
+
+
+def readSmithPoints( fnames, labels=None ):
+   '''returns the flow coefficient (phi), loading coefficient (psi) and
+      segmentEff of every rotor segment of every page of the page viewer
+      files fnames, one row per segment; stator segments, which have no
+      coefficients, are left out.  phi is taken positive for both senses
+      of rotation.'''
+
+   rows = []
+   for i, fname in enumerate( fnames ):
+      label = labels[i] if labels is not None else fname
+      for p, page in enumerate( readPages( fname ) ):
+         if "BladeSegment Geometry" not in page.blocks:
+            continue
+         geometry = page["BladeSegment Geometry"]
+         flow = page["BladeSegment Flow Conditions"]
+         for name, phi, psi, eff, W in zip( geometry.names, geometry['phi'], geometry['psi'],
+                                            flow['segmentEff'], flow['Fl_IR.W'] ):
+            if phi != 0.:
+               rows.append( ( label, p, name.rsplit( ".", 1 )[0], name, abs(phi), psi, eff, W ) )
+
+   return numpy.array( rows, dtype=smithType )
+
+
+
+
+def stagePoints( points ):
+   '''returns one flow weighted point per blade row and page of points'''
+
+   keys, index = numpy.unique( numpy.char.add( numpy.char.add( numpy.char.add( points['label'], "|" ),
+                                                               points['page'].astype( 'U8' ) ),
+                                               numpy.char.add( "|", points['row'] ) ), return_inverse=True )
+   first = numpy.zeros( len(keys), dtype=int )
+   first[ index[::-1] ] = numpy.arange( len(points) )[::-1]
+
+   stages = points[first].copy()
+   W = numpy.bincount( index, points['W'], minlength=len(keys) )
+   for name in ( 'phi', 'psi', 'eff' ):
+      stages[name] = numpy.bincount( index, points[name]*points['W'], minlength=len(keys) )/W
+   stages['W'] = W
+   stages['segment'] = stages['row']
+   return stages
+
+
+
+
+def smithModel( phi, psi, lossWake=0.09, lossVane=0.001 ):
+   '''efficiency of a repeating axial turbine stage from its flow and
+      loading coefficients, the model smith_plot.m contours
+
+      lossWake     kinetic energy loss coefficient of the relative flow
+      lossVane     the same of the absolute flow
+   '''
+
+   tanBeta = ( psi/4. + 1. )/phi
+   tanAlpha = psi/( 4.*phi )
+   return 1./( 1. + ( lossVane**2*( 1. + tanAlpha**2 ) + 2.*lossWake*phi**2*( 1. + tanBeta**2 ) )/( 4.*psi ) )
+
+
+
+
+def gridPoints( points, phiGrid, psiGrid, method="linear" ):
+   '''interpolates the efficiency of scattered points onto the phi x psi
+      grid; NaN outside their convex hull'''
+
+   phi, psi = numpy.meshgrid( phiGrid, psiGrid )
+   scale = numpy.array( [ numpy.ptp( points['phi'] ), numpy.ptp( points['psi'] ) ] )
+   scale[ scale == 0. ] = 1.
+   known = numpy.isfinite( points['eff'] )
+   samples = numpy.column_stack( ( points['phi'][known], points['psi'][known] ) )/scale
+   return phi, psi, scipy.interpolate.griddata( samples, points['eff'][known],
+                                                numpy.column_stack( ( phi.ravel(), psi.ravel() ) )/scale,
+                                                method=method ).reshape( phi.shape )
+
+
+
+
+def smithChart( points, figure=None, levels=defaultLevels, model=False, resolution=200,
+                phiRange=None, psiRange=None ):
+   '''contours segment efficiency over flow and loading coefficient and
+      overlays each design's segment and stage points, one marker per
+      design (label) and one color per blade row
+
+      points       readSmithPoints rows
+      levels       efficiency contour levels
+      model        contour smithModel instead of the points, e.g. for a
+                   single design or lossless points with no spread
+      resolution   grid points on each axis
+
+      returns the figure
+   '''
+
+   if figure is None:
+      figure = pylab.figure( figsize=(10,8), facecolor='white' )
+   axes = figure.add_subplot( 1, 1, 1 )
+
+   if phiRange is None:
+      phiRange = ( 0.2, 1.6 ) if model or len(points) == 0 else ( points['phi'].min(), points['phi'].max() )
+   if psiRange is None:
+      psiRange = ( 0.5, 10. ) if model or len(points) == 0 else ( points['psi'].min(), points['psi'].max() )
+   phiGrid = numpy.linspace( phiRange[0], phiRange[1], resolution )
+   psiGrid = numpy.linspace( psiRange[0], psiRange[1], resolution )
+
+   if model:
+      phi, psi = numpy.meshgrid( phiGrid, psiGrid )
+      eff = smithModel( phi, psi )
+   else:
+      if len(points) < 3:
+         raise ValueError( "contouring needs 3 or more points, use the model" )
+      phi, psi, eff = gridPoints( points, phiGrid, psiGrid )
+
+   if numpy.any( ( eff >= levels[0] ) & ( eff <= levels[-1] ) ):
+      contours = axes.contour( phi, psi, eff, levels, colors='grey' )
+      axes.clabel( contours, fmt="%.2f" )
+
+   if len(points):
+      axes.scatter( points['phi'], points['psi'], s=6, color='black', label='segments' )
+      # one marker per design and one color per blade row
+      stages = stagePoints( points )
+      labels = numpy.unique( stages['label'] )
+      rows = numpy.unique( stages['row'] )
+      for i, label in enumerate( labels ):
+         for j, row in enumerate( rows ):
+            mine = ( stages['label'] == label ) & ( stages['row'] == row )
+            if not mine.any():
+               continue
+            axes.plot( stages['phi'][mine], stages['psi'][mine], stageMarkers[ i % len(stageMarkers) ],
+                       color='C%d' % ( j % 10 ), markersize=5,
+                       label=row if len(labels) == 1 else "%s: %s" % ( label, row ) )
+      axes.legend( loc='best' )
+
+   axes.set_xlabel( 'phi, flow coefficient (Vm/U)' )
+   axes.set_ylabel( 'psi, loading coefficient (delta ht/U^2)' )
+   return figure
+
+
+
+
+if __name__ == "__main__":
+
+   parser = argparse.ArgumentParser( description="Smith chart of the rotor segments of page viewer output" )
+   parser.add_argument( "files", nargs="+", help="viewOut files or glob patterns" )
+   parser.add_argument( "-o", "--output", default="smith.png", help="image file" )
+   parser.add_argument( "--model", action="store_true", help="contour the stage model, not the points" )
+   args = parser.parse_args()
+
+   # render off screen; importers keep their own backend
+   matplotlib.use( "Agg" )
+   fnames = sorted( set( fname for pattern in args.files for fname in glob.glob( pattern ) ) )
+   points = readSmithPoints( fnames )
+   figure = smithChart( points, model=args.model )
+   figure.savefig( args.output, facecolor=figure.get_facecolor() )
+   print( "%d segments of %d files in %s" % ( len(points), len(fnames), args.output ) )
@@ -0,0 +1,195 @@
+#
+# =============================================================================
+#          SOLVER CONVERGENCE TELEMETRY OF SWEEPS
+#                      (ITERATION, JACOBIAN AND BROYDEN COUNTS PER CASE AND
+#                       PER ASSEMBLY SOLVER FROM PAGE VIEWER OUTPUT)
+#
+# =============================================================================
+
+
+# python solverTelemetry.py doe/*/test_output/*.viewOut -n 20
+# python solverTelemetry.py --doe doe -o telemetry.csv
+
+
+import argparse
+import csv
+import glob
+import os
+
+import numpy
+
+from viewOutReader import readPages
+
+
+counterNames = ( "converged", "iterations", "passes", "jacobians", "broydens" )
+
+# page blocks of the assembly solver counters (view/OTACpage.view) and the
+# solver each one reports
+solverBlocks = {
+   "BladeRow Solvers"          : "BRsolver",
+   "TransitionSection Solvers" : "TSsolver",
+   "Expander Solvers"          : "EXsolver",
+   "Start Solvers"             : "STARTsolver",
+   "Reducer Solvers"           : "REDUCERsolver",
+}
+
+telemetryType = numpy.dtype( [ ( 'label', 'U64' ), ( 'file', 'U256' ), ( 'page', 'i4' ),
+                               ( 'case', 'U16' ), ( 'mode', 'U16' ), ( 'solver', 'U64' ),
+                               ( 'seconds', 'f8' ) ] + [ ( name, 'f8' ) for name in counterNames ] )
+
+
+
+
+def pageTelemetry( page ):
+   '''returns ( solver, counters ) of the top level solver, named 'solver',
+      and of each assembly solver of a page, named <assembly>.<solver>'''
+
+   rows = [ ( "solver", [ page.title.get( name, numpy.nan ) for name in counterNames ] ) ]
+
+   for blockTitle, solver in solverBlocks.items():
+      if blockTitle not in page.blocks:
+         continue
+      block = page[blockTitle]
+      columns = [ block[name] if name in block.columns else numpy.full( len(block), numpy.nan )
+                  for name in counterNames ]
+      for i, name in enumerate( block.names ):
+         rows.append( ( name + "." + solver, [ column[i] for column in columns ] ) )
+
+   return rows
+
+
+
+
+def readTelemetry( fnames, labels=None, seconds=None ):
+   '''returns the solver counters of every page of the page viewer files
+      fnames as one structured array, one row per page and solver
+
+      labels       name of each file in the table, the file name by default
+      seconds      wall time of each file's run, NaN by default
+   '''
+
+   rows = []
+   for i, fname in enumerate( fnames ):
+      label = labels[i] if labels is not None else fname
+      time = seconds[i] if seconds is not None else numpy.nan
+      for p, page in enumerate( readPages( fname ) ):
+         for solver, counters in pageTelemetry( page ):
+            rows.append( ( label, fname, p, page.title.get( 'case', "" ), page.title.get( 'mode', "" ),
+                           solver, time ) + tuple( counters ) )
+
+   return numpy.array( rows, dtype=telemetryType )
+
+
+
+
+def readDOETelemetry( outdir ):
+   '''returns the telemetry of a runDOE sweep, labelled by case and with the
+      wall time of each case from outdir/results.csv'''
+
+   fnames, labels, seconds = [], [], []
+   with open( os.path.join( outdir, "results.csv" ) ) as f:
+      for result in csv.DictReader( f ):
+         for fname in result['outputs'].split( ";" ):
+            if fname.endswith( ( ".viewOut", ".out" ) ) and os.path.exists( fname ):
+               fnames.append( fname )
+               labels.append( result['case'] )
+               seconds.append( float( result['seconds'] ) )
+
+   return readTelemetry( fnames, labels, seconds )
+
+
+
+
+def rankCases( table, by="jacobians", count=None ):
+   '''returns the top level solver rows of table with an 'assemblies' field
+      summing the by counter of the assembly solvers of each page, most
+      expensive (top level plus assemblies) first'''
+
+   top = table['solver'] == "solver"
+   pages, index = numpy.unique( numpy.char.add( numpy.char.add( table['file'], "|" ), table['page'].astype( 'U8' ) ),
+                                return_inverse=True )
+   assemblies = numpy.bincount( index, numpy.where( top, 0., numpy.nan_to_num( table[by] ) ),
+                                minlength=len(pages) )
+
+   dtype = numpy.dtype( table.dtype.descr + [ ( 'assemblies', 'f8' ) ] )
+   cases = numpy.zeros( top.sum(), dtype=dtype )
+   for name in table.dtype.names:
+      cases[name] = table[name][top]
+   cases['assemblies'] = assemblies[ index[top] ]
+
+   order = numpy.lexsort( ( -cases[by], -( numpy.nan_to_num( cases[by] ) + cases['assemblies'] ) ) )
+   return cases[order][:count]
+
+
+
+
+def rankSolvers( table, by="jacobians", count=None ):
+   '''returns the totals of each solver over all the pages of table, most
+      expensive first: the number of pages, the pages it did not converge
+      on, the counter sums and the largest value of the by counter'''
+
+   names, index = numpy.unique( table['solver'], return_inverse=True )
+   dtype = [ ( 'solver', names.dtype ), ( 'pages', 'i4' ), ( 'failures', 'i4' ) ]
+   dtype += [ ( name, 'f8' ) for name in counterNames[1:] ] + [ ( 'max', 'f8' ) ]
+   totals = numpy.zeros( len(names), dtype=dtype )
+
+   totals['solver'] = names
+   totals['pages'] = numpy.bincount( index, minlength=len(names) )
+   totals['failures'] = numpy.bincount( index, table['converged'] == 0, minlength=len(names) )
+   for name in counterNames[1:]:
+      totals[name] = numpy.bincount( index, numpy.nan_to_num( table[name] ), minlength=len(names) )
+   totals['max'] = numpy.full( len(names), -numpy.inf )
+   numpy.maximum.at( totals['max'], index, numpy.nan_to_num( table[by], nan=-numpy.inf ) )
+
+   order = numpy.argsort( -totals[by], kind='stable' )
+   return totals[order][:count]
+
+
+
+
+def report( table, by="jacobians", count=20 ):
+   '''returns a text report of the most expensive cases and solvers'''
+
+   lines = [ "most %s by case" % by,
+             "%-24s %5s %-10s %4s %6s %6s %6s %6s %10s %8s" %
+             ( "case", "page", "mode", "conv", "iter", "pass", "Jac", "Broy", "assemblies", "seconds" ) ]
+   for row in rankCases( table, by, count ):
+      lines.append( "%-24s %5d %-10s %4.0f %6.0f %6.0f %6.0f %6.0f %10.0f %8.1f" %
+                    ( row['label'][-24:], row['page'], row['mode'], row['converged'], row['iterations'],
+                      row['passes'], row['jacobians'], row['broydens'], row['assemblies'], row['seconds'] ) )
+
+   lines += [ "", "most %s by solver" % by,
+              "%-32s %6s %6s %8s %8s %8s %8s %6s" %
+              ( "solver", "pages", "failed", "iter", "pass", "Jac", "Broy", "max" ) ]
+   for row in rankSolvers( table, by, count ):
+      lines.append( "%-32s %6d %6d %8.0f %8.0f %8.0f %8.0f %6.0f" %
+                    ( row['solver'][-32:], row['pages'], row['failures'], row['iterations'],
+                      row['passes'], row['jacobians'], row['broydens'], row['max'] ) )
+
+   return "\n".join( lines )
+
+
+
+
+if __name__ == "__main__":
+
+   parser = argparse.ArgumentParser( description="solver convergence telemetry of page viewer output" )
+   parser.add_argument( "files", nargs="*", help="viewOut files or glob patterns" )
+   parser.add_argument( "--doe", default=None, help="runDOE output directory instead of files" )
+   parser.add_argument( "-b", "--by", default="jacobians", choices=counterNames[1:], help="counter to rank by" )
+   parser.add_argument( "-n", "--count", type=int, default=20, help="rows of each ranking" )
+   parser.add_argument( "-o", "--output", default=None, help="csv file for the whole table" )
+   args = parser.parse_args()
+
+   if args.doe is not None:
+      table = readDOETelemetry( args.doe )
+   else:
+      table = readTelemetry( sorted( set( fname for pattern in args.files for fname in glob.glob( pattern ) ) ) )
+
+   if args.output is not None:
+      with open( args.output, "w", newline="" ) as f:
+         writer = csv.writer( f )
+         writer.writerow( table.dtype.names )
+         writer.writerows( table.tolist() )
+
+   print( report( table, args.by, args.count ) )
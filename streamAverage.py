@@ -0,0 +1,195 @@
+#
+# =============================================================================
+#          MASS AVERAGED AND MIXED OUT STATES OF STREAMLINE STATIONS
+#                      (THE Reducer AREA, IMPULSE AND TORQUE BALANCES AND
+#                       TransitionSection1 AVERAGES FOR PARSED OUTPUT)
+#
+# =============================================================================
+
+
+# python streamAverage.py test_output/test_2stgCRturbine.viewOut
+
+
+import argparse
+import re
+
+import numpy
+
+from meanline import GRAVITY, JOULES_CONST, air, pressureRatio
+from viewOutReader import readPages
+
+C_INtoFT = 1./12.
+
+# OUTPUT FLOW columns of each stream used by the averages
+streamColumns = ( "W", "Pt", "Ps", "Tt", "area", "Vm", "Vtheta", "phi", "radius", "radiusInner", "radiusOuter" )
+
+# streamline stations are named <station>_<stream>, hub stream first
+streamPattern = re.compile( r"^(.*)_(\d+)$" )
+
+
+
+
+def streamStations( block ):
+   '''returns the streamline stations of an OUTPUT FLOW block and the row of
+      each of their streams, stations x streams, -1 past the last stream of
+      stations with fewer streams'''
+
+   stations = []
+   streams = {}
+   for row, name in enumerate( block.names ):
+      match = streamPattern.match( name )
+      if match is None:
+         continue
+      station = match.group(1)
+      if station not in streams:
+         stations.append( station )
+         streams[station] = []
+      streams[station].append( ( int( match.group(2) ), row ) )
+
+   rows = numpy.full( ( len(stations), max( [ len(s) for s in streams.values() ] + [ 0 ] ) ), -1 )
+   for i, station in enumerate( stations ):
+      for j, ( stream, row ) in enumerate( sorted( streams[station] ) ):
+         rows[i,j] = row
+   return stations, rows
+
+
+
+
+def readStreams( pages, columns=streamColumns, blockTitle="OUTPUT FLOW" ):
+   '''returns the streamline stations of pages (which must share them) and
+      {column: array}, pages x stations x streams, NaN past the last stream
+      of a station'''
+
+   stations, rows = streamStations( pages[0][blockTitle] )
+   streams = dict( ( column, numpy.full( ( len(pages), ) + rows.shape, numpy.nan ) ) for column in columns )
+   for p, page in enumerate( pages ):
+      block = page[blockTitle]
+      if len(block) <= rows.max( initial=-1 ):
+         raise ValueError( "page %d does not have the streams of the first page" % p )
+      for column in columns:
+         streams[column][p] = numpy.where( rows >= 0, block[column][rows], numpy.nan )
+
+   return stations, streams
+
+
+
+
+def massAverage( value, W, axis=-1 ):
+   '''flow weighted mean of value over axis, ignoring NaN streams'''
+
+   weight = numpy.where( numpy.isnan( value ), 0., numpy.nan_to_num( W ) )
+   return numpy.nansum( value*weight, axis=axis )/weight.sum( axis=axis )
+
+
+
+
+def areaAverage( value, area, axis=-1 ):
+   '''area weighted mean of value over axis, ignoring NaN streams'''
+
+   return massAverage( value, area, axis )
+
+
+
+
+def streamTotals( streams, gas=air ):
+   '''returns the sums the Reducer balances over the last axis of the stream
+      arrays: W, area, the meridional impulse (Imp, lbf), the angular
+      momentum (Trq, ft lbf) and W*phi, with the mass averaged ht of gas'''
+
+   W = streams['W']
+   impulse = W*streams['Vm']/GRAVITY + streams['Ps']*streams['area']
+   torque = W*streams['radius']*streams['Vtheta']*( C_INtoFT/GRAVITY )
+
+   return { 'W': numpy.nansum( W, axis=-1 ), 'area': numpy.nansum( streams['area'], axis=-1 ),
+            'Imp': numpy.nansum( impulse, axis=-1 ), 'Trq': numpy.nansum( torque, axis=-1 ),
+            'Phi': numpy.nansum( W*streams['phi'], axis=-1 ),
+            'ht': massAverage( gas.h( streams['Tt'] ), W ) }
+
+
+
+
+def mixedOut( streams, gas=air, branch="subsonic", maxIterations=20 ):
+   '''mixes the streams of each station to the single state the Reducer
+      solves for: the flow, mass averaged enthalpy, area, meridional impulse
+      and angular momentum of the streams are kept, at the mean of the hub
+      and tip radius and the mass averaged meridional angle
+
+      streams      {column: array}, the readStreams columns with the
+                   streams on the last axis
+      gas          meanline air or IdealGas, ht is mass averaged with it
+      branch       "subsonic" or "supersonic" root of the impulse balance
+
+      returns {name: array} over the other axes: the mixed out W, Tt, Pt,
+      Ps, Ts, MN, alpha (deg, as the page), phi, Vm, Vtheta, radius and
+      area; the mass averaged TtMass and PtMass and area averaged PtArea
+      and PsArea; and the totals Imp, Trq balanced by the mixed out state
+   '''
+
+   if branch not in ( "subsonic", "supersonic" ):
+      raise ValueError( "unknown mixed out branch: " + str( branch ) )
+
+   totals = streamTotals( streams, gas )
+   W, area, impulse, ht = totals['W'], totals['area'], totals['Imp'], totals['ht']
+   Tt = gas.T( ht )
+
+   radius = ( numpy.nanmin( streams['radiusInner'], axis=-1 ) + numpy.nanmax( streams['radiusOuter'], axis=-1 ) )/2.
+   Vtheta = totals['Trq']*GRAVITY/( W*radius*C_INtoFT )
+   phi = totals['Phi']/W
+
+   # with the mean cp between Ts and Tt, continuity and impulse give
+   #    ( Imp - W*Vm/g )*Vm = W*R*J*Ts,  Ts = Tt - ( Vm^2 + Vtheta^2 )/( 2*g*J*cp )
+   # a quadratic in Vm; cp is updated from the root until Ts settles
+   cp = gas.Cp( Tt )
+   Ts = Tt
+   for iteration in range( maxIterations ):
+      a = W/GRAVITY*( 1. - gas.R/( 2.*cp ) )
+      c = W*gas.R*( JOULES_CONST*Tt - Vtheta**2/( 2.*GRAVITY*cp ) )
+      with numpy.errstate( invalid='ignore' ):
+         root = numpy.sqrt( impulse**2 - 4.*a*c )
+      if branch == "subsonic":
+         Vm = 2.*c/( impulse + root )
+      else:
+         Vm = ( impulse + root )/( 2.*a )
+
+      dynamic = ( Vm**2 + Vtheta**2 )/( 2.*GRAVITY*JOULES_CONST )
+      TsNew = gas.T( ht - dynamic )
+      with numpy.errstate( divide='ignore', invalid='ignore' ):
+         cp = numpy.where( dynamic > 0., dynamic/( Tt - TsNew ), cp )
+      converged = not numpy.any( abs( TsNew - Ts ) >= 1e-10*Tt )
+      Ts = TsNew
+      if converged:
+         break
+
+   Ps = ( impulse - W*Vm/GRAVITY )/area
+   V = numpy.hypot( Vm, Vtheta )
+   Cps = gas.Cp( Ts )
+   MN = V/numpy.sqrt( Cps/( Cps - gas.R )*gas.R*GRAVITY*JOULES_CONST*Ts )
+
+   return { 'W': W, 'Tt': Tt, 'Pt': Ps*pressureRatio( gas, Ts, Tt ), 'Ps': Ps, 'Ts': Ts, 'MN': MN,
+            'alpha': numpy.degrees( numpy.arctan2( Vtheta, Vm ) ), 'phi': phi, 'Vm': Vm, 'Vtheta': Vtheta,
+            'radius': radius, 'area': area,
+            'TtMass': massAverage( streams['Tt'], streams['W'] ),
+            'PtMass': massAverage( streams['Pt'], streams['W'] ),
+            'PtArea': areaAverage( streams['Pt'], streams['area'] ),
+            'PsArea': areaAverage( streams['Ps'], streams['area'] ),
+            'Imp': impulse, 'Trq': totals['Trq'] }
+
+
+
+
+if __name__ == "__main__":
+
+   parser = argparse.ArgumentParser( description="mixed out states of the streamline stations of page viewer output" )
+   parser.add_argument( "files", nargs="+", help="viewOut files" )
+   args = parser.parse_args()
+
+   names = ( "W", "TtMass", "PtMass", "Pt", "Ps", "MN", "alpha" )
+   for fname in args.files:
+      pages = readPages( fname )
+      stations, streams = readStreams( pages )
+      mixed = mixedOut( streams )
+      print( fname )
+      print( "%4s %-12s" % ( "page", "station" ) + "".join( "%10s" % name for name in names ) )
+      for p in range( len(pages) ):
+         for s, station in enumerate( stations ):
+            print( "%4d %-12s" % ( p, station ) + "".join( "%10.4f" % mixed[name][p,s] for name in names ) )
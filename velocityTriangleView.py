@@ -0,0 +1,119 @@
+#
+# =============================================================================
+#          REUSABLE VELOCITY TRIANGLE FIGURE
+#                      (ARTISTS ARE BUILT ONCE AND UPDATED PER BLADE ROW)
+#
+# =============================================================================
+
+
+import numpy
+import pylab
+from matplotlib.collections import LineCollection
+
+from plotAirfoilAndVT import arrowStyle, streamArrows
+
+
+
+class VelocityTriangleView( object ):
+   '''figure with the velocity arrows, blade cartoons and title of one blade
+      row, every stream of rows written per stream; update() moves the
+      existing artists to a new blade row or operating point instead of
+      building a new figure
+
+      the arrows are one quiver per color and the cartoons one LineCollection
+      per line color, as plotSLVelocityTriangles draws them
+
+      with blit=True the artists are animated: show() redraws only them over
+      a saved background, so stepping through a sweep costs a few
+      milliseconds per frame.  Animated artists are left out of savefig, so
+      use blit=False for files.
+   '''
+
+   __slots__ = ( 'figure', 'axes', 'arrows', 'lines', 'title', 'blit', 'background' )
+
+   def __init__( self, figure=None, axes=( 0., 4000., -2000., 2000. ), blit=False ):
+
+      if figure is None:
+         figure = pylab.figure( figsize=(10,10), facecolor='white' )
+      self.figure = figure
+      self.axes = figure.add_subplot( 1, 1, 1 )
+      self.axes.axis( axes )
+      self.axes.set_ylabel( 'velocity, ft/s' )
+      self.axes.set_xlabel( 'velocity, ft/s' )
+      self.blit = blit
+      self.background = None
+
+      # absolute, relative and blade speed arrows, built by the first update
+      self.arrows = dict( ( color, None ) for color in ( 'gold', 'red', 'blue' ) )
+
+      # camber lines, then suction and pressure surfaces
+      self.lines = [ LineCollection( [], colors=color, animated=blit ) for color in ( 'grey', 'black' ) ]
+      for line in self.lines:
+         self.axes.add_collection( line )
+      self.title = self.axes.set_title( '', animated=blit )
+
+      if blit:
+         figure.canvas.mpl_connect( 'draw_event', self.saveBackground )
+
+   def saveBackground( self, event=None ):
+      '''keeps the figure without the animated artists for blitting'''
+      self.background = self.figure.canvas.copy_from_bbox( self.figure.bbox )
+
+   def artists( self ):
+      return list( self.arrows.values() ) + self.lines + [ self.title ]
+
+   def setArrows( self, color, x, y, dx, dy, visible ):
+      '''moves the quiver of one color to the arrows x, y, dx, dy, hiding
+         those not visible; a new quiver is built when the arrow count
+         changes'''
+
+      quiver = self.arrows[color]
+      if quiver is None or quiver.N != len(x):
+         if quiver is not None:
+            quiver.remove()
+         quiver = self.axes.quiver( x, y, dx, dy, color=color, animated=self.blit, **arrowStyle )
+         self.arrows[color] = quiver
+      quiver.set_offsets( numpy.column_stack( ( x, y ) ) )
+      quiver.set_UVC( numpy.ma.masked_where( ~visible, dx ), numpy.ma.masked_where( ~visible, dy ) )
+
+   def update( self, BR ):
+      '''moves the artists to the blade row BR, every stream of rows
+         written per stream, and returns them'''
+
+      arrows, cartoons = streamArrows( BR )
+      for color in self.arrows:
+         x, y, dx, dy, visible = [ numpy.concatenate( [ numpy.ravel( arrow[k] ) for arrow in arrows if arrow[0] == color ] )
+                                   for k in range( 1, 6 ) ]
+         self.setArrows( color, x, y, dx, dy, visible )
+
+      self.lines[0].set_segments( cartoons[0] )
+      self.lines[1].set_segments( cartoons[1:].reshape( ( -1, ) + cartoons.shape[2:] ) )
+      self.title.set_text( BR ['bladerowName'] + ': flow and blade angles' )
+
+      return self.artists()
+
+   def show( self, BR ):
+      '''draws the figure for the blade row BR'''
+
+      self.update( BR )
+      canvas = self.figure.canvas
+
+      if not self.blit:
+         canvas.draw_idle()
+         return
+
+      if self.background is None:
+         canvas.draw()
+      canvas.restore_region( self.background )
+      for artist in self.artists():
+         self.figure.draw_artist( artist )
+      canvas.blit( self.figure.bbox )
+      canvas.flush_events()
+
+   def sweep( self, rows, pause=0. ):
+      '''steps the figure through the blade rows or operating points in rows'''
+
+      for BR in rows:
+         self.show( BR )
+         if pause > 0.:
+            pylab.pause( pause )
@@ -0,0 +1,112 @@
+#
+# =============================================================================
+#          VECTORIZED VELOCITY TRIANGLE KINEMATICS
+#                      (FLOWSTATION AND BLADESEGMENT CONVENTIONS OF OTAC)
+#
+# =============================================================================
+
+
+import numpy
+
+c_DEGtoRAD = numpy.pi/180.
+c_RPMtoRAD_PER_SEC = numpy.pi/30.
+
+
+
+def triangles( radius, Nmech, Vz, Vtheta, Vr=0., rotating=True, MN=None ):
+   '''returns the absolute and relative velocity triangles of stations
+
+      radius      station radius, in
+      Nmech       shaft speed, rpm (negative for counter-rotating spools)
+      Vz, Vtheta, Vr   axial, tangential and radial velocity, ft/s
+      rotating    False (or "NON_ROTATING") for stations in a stator frame
+      MN          absolute Mach number, optional, for MNrel
+
+      the inputs broadcast against each other, so stations x streams x cases
+      are done in one pass.  Returns a dictionary of arrays named as the
+      FlowStation variables, angles in radians:
+
+      U           blade speed, omega*radius
+      Vm          meridional velocity
+      Vflow       absolute velocity
+      alpha       absolute flow angle, atan( Vtheta/Vm )
+      phi         meridional pitch angle, atan( Vr/Vz )
+      VthetaRel   relative tangential velocity, U - Vtheta
+      Vrel        relative velocity
+      beta        relative flow angle, atan( VthetaRel/Vm )
+      MNrel       relative Mach number, when MN is given
+   '''
+
+   if isinstance( rotating, str ):
+      rotating = rotating == "ROTATING"
+
+   omega = numpy.where( rotating, Nmech*c_RPMtoRAD_PER_SEC, 0. )
+   U = omega*radius/12.
+
+   Vm = numpy.hypot( Vz, Vr )
+   Vflow = numpy.hypot( Vm, Vtheta )
+   VthetaRel = U - Vtheta
+   Vrel = numpy.hypot( Vm, VthetaRel )
+
+   result = { 'radius': radius + 0.*U, 'U': U, 'Vz': Vz + 0.*U, 'Vr': Vr + 0.*U,
+              'Vtheta': Vtheta + 0.*U, 'Vm': Vm, 'Vflow': Vflow, 'alpha': numpy.arctan2( Vtheta, Vm ),
+              'phi': numpy.arctan2( Vr, Vz ) + 0.*U,
+              'VthetaRel': VthetaRel, 'Vrel': Vrel, 'beta': numpy.arctan2( VthetaRel, Vm ) }
+   if MN is not None:
+      with numpy.errstate( divide='ignore', invalid='ignore' ):
+         result['MNrel'] = MN*Vrel/Vflow
+
+   return result
+
+
+
+
+def bladeAngles( beta, angle, switchBladeAngleSign ):
+   '''returns the blade metal angle from the relative flow angle and the
+      incidence (inlet) or deviation (exit), as BladeSegment does at design:
+      -beta + angle for "POSITIVE" rows and -beta - angle for "NEGATIVE" ones'''
+
+   positive = numpy.asarray( switchBladeAngleSign ) == "POSITIVE"
+   return numpy.where( positive, -beta + angle, -beta - angle )
+
+
+
+
+def incidence( beta, bladeInletAngle, switchBladeAngleSign ):
+   '''returns the incidence of the relative flow angle on a blade, as
+      BladeSegment does off-design'''
+
+   positive = numpy.asarray( switchBladeAngleSign ) == "POSITIVE"
+   return numpy.where( positive, beta + bladeInletAngle, -beta - bladeInletAngle )
+
+
+
+
+def stageParameters( inlet, exit, solidity=None, rotating=True ):
+   '''returns the blade segment parameters of an inlet and exit triangle set
+
+      Euler       change of U*Vtheta across the segment, ft2/s2
+      phi         flow coefficient, inlet Vm/U
+      psi         loading coefficient, |Euler|/Umean^2, positive for
+                  compressors and turbines
+      deHaller    Vrel ratio
+      deflection  inlet minus exit relative flow angle, rad
+      DF          diffusion factor with radius change, when solidity is given;
+                  uses the inlet and exit radius
+   '''
+
+   if isinstance( rotating, str ):
+      rotating = rotating == "ROTATING"
+
+   with numpy.errstate( divide='ignore', invalid='ignore' ):
+      Euler = exit['U']*exit['Vtheta'] - inlet['U']*inlet['Vtheta']
+      Umean = ( inlet['U'] + exit['U'] )/2.
+      result = { 'Euler': Euler, 'phi': inlet['Vm']/inlet['U'], 'psi': abs(Euler)/Umean**2,
+                 'deHaller': exit['Vrel']/inlet['Vrel'], 'deflection': inlet['beta'] - exit['beta'] }
+
+      if solidity is not None:
+         rVtheta = exit['radius']*exit['Vtheta'] - inlet['radius']*inlet['Vtheta']
+         term = rVtheta/( 2.*solidity*inlet['Vrel']*( inlet['radius'] + exit['radius'] )/2. )
+         result['DF'] = 1. - exit['Vrel']/inlet['Vrel'] + numpy.where( rotating, term, -term )
+
+   return result
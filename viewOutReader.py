@@ -0,0 +1,327 @@
+#
+# =============================================================================
+#          PYTHON READER FOR NPSS PAGE VIEWER OUTPUT
+#                      (viewOut AND .out FILES WRITTEN BY OTACpage)
+#
+# =============================================================================
+
+
+import mmap
+import re
+
+import numpy
+
+
+# the title block of each page holds the case and solver counters
+titlePatterns = {
+   'version'        : ( re.compile( rb"NCP\s+(\S+)" ), bytes.decode ),
+   'user'           : ( re.compile( rb"run by:\s*(\S+)" ), bytes.decode ),
+   'solutionMode'   : ( re.compile( rb"solutionMode=\s*(\S+)" ), bytes.decode ),
+   'converged'      : ( re.compile( rb"converge=\s*(\S+)" ), int ),
+   'case'           : ( re.compile( rb"case:\s*(\S+)" ), bytes.decode ),
+   'time'           : ( re.compile( rb"time:\s*(\S+)" ), float ),
+   'timeStep'       : ( re.compile( rb"timeStep:\s*(\S+)" ), float ),
+   'thermPackage'   : ( re.compile( rb"therm_package:\s*(\S+)" ), bytes.decode ),
+   'mode'           : ( re.compile( rb"Mode:\s*(\S+)" ), bytes.decode ),
+   'iterations'     : ( re.compile( rb"iter/pas/Jac/Broy=\s*(\d+)/" ), int ),
+   'passes'         : ( re.compile( rb"iter/pas/Jac/Broy=\s*\d+/\s*(\d+)/" ), int ),
+   'jacobians'      : ( re.compile( rb"iter/pas/Jac/Broy=\s*\d+/\s*\d+/\s*(\d+)/" ), int ),
+   'broydens'       : ( re.compile( rb"iter/pas/Jac/Broy=\s*\d+/\s*\d+/\s*\d+/\s*(\d+)" ), int ),
+   'run'            : ( re.compile( rb"run:\s*(\S+\s+\S+)" ), bytes.decode ),
+}
+
+# column headings are right aligned with their values and may hold single spaces
+headingPattern = re.compile( rb"\S+(?: \S+)*" )
+
+
+
+def toFloat( text ):
+   '''converts a page value to a float, NaN when it overflowed its format'''
+
+   try:
+      return float( text )
+   except ValueError:
+      return numpy.nan
+
+
+
+
+class Block( object ):
+   '''one table of a page, with one row per component and one column per
+      attribute; columns are parsed from the file when they are first used
+
+      names        station (link) or component name of each row
+      components   component name of each row; the same as names for
+                   component tables
+      columns      column headings
+   '''
+
+   __slots__ = ( 'title', 'names', 'components', 'columns', 'spans', 'buffer',
+                 'lineStarts', 'lineLengths', 'cache' )
+
+   def __init__( self, title, columns, spans, buffer, lineStarts, lineLengths, names, components ):
+
+      self.title = title
+      self.columns = columns
+      self.spans = spans
+      self.buffer = buffer
+      self.lineStarts = numpy.array( lineStarts, dtype=numpy.intp )
+      self.lineLengths = numpy.array( lineLengths, dtype=numpy.intp )
+      self.names = numpy.array( names )
+      self.components = numpy.array( components )
+      self.cache = {}
+
+   def __len__( self ):
+      return len(self.names)
+
+   def __getitem__( self, column ):
+      return self.column( column )
+
+   def column( self, column ):
+      '''returns the values of a column as a float array'''
+
+      if column not in self.cache:
+         if self.buffer is None:
+            raise ValueError( "page file is closed, %s was not read" % column )
+         lo, hi = self.spans[ self.columns.index( column ) ]
+
+         # gather the fixed-width field of every row, blank past the line end
+         offsets = numpy.arange( lo, hi )
+         inLine = offsets < self.lineLengths[:,None]
+         index = numpy.where( inLine, self.lineStarts[:,None] + offsets, 0 )
+         chars = numpy.where( inLine, self.buffer[index], ord(" ") ).astype( numpy.uint8 )
+         text = chars.view( "S%d" % ( hi - lo ) ).ravel()
+
+         try:
+            values = text.astype( float )
+         except ValueError:
+            values = numpy.array( [ toFloat( value ) for value in text ] )
+         self.cache[column] = values
+
+      return self.cache[column]
+
+   def row( self, name ):
+      '''returns the row number of a station or component name'''
+
+      match = numpy.flatnonzero( ( self.names == name ) | ( self.components == name ) )
+      if len(match) == 0:
+         raise KeyError( name )
+      return match[0]
+
+   def value( self, name, column ):
+      '''returns the value of a column for a station or component name'''
+      return self.column( column )[ self.row( name ) ]
+
+   def table( self ):
+      '''returns the whole block as a structured array with 'name' and
+         'component' fields followed by one float field per column'''
+
+      dtype = [ ( 'name', self.names.dtype ), ( 'component', self.components.dtype ) ]
+      dtype += [ ( column, 'f8' ) for column in self.columns ]
+      table = numpy.zeros( len(self), dtype=dtype )
+      table['name'] = self.names
+      table['component'] = self.components
+      for column in self.columns:
+         table[column] = self.column( column )
+
+      return table
+
+
+
+
+class Page( object ):
+   '''one page of output: the title block values of a case and its tables,
+      keyed by their titles'''
+
+   __slots__ = ( 'title', 'blocks' )
+
+   def __init__( self, title ):
+      self.title = title
+      self.blocks = {}
+
+   def __getitem__( self, blockTitle ):
+      return self.blocks[ blockTitle ]
+
+
+
+
+class PageFile( object ):
+   '''page viewer output file, memory mapped and indexed by page and block;
+      block values are parsed only when a column is requested
+
+      close() releases the map and the file, after which only the columns
+      already read are available; load() first copies the file into memory
+      so every column stays readable.  As a context manager the file is
+      closed on leaving the with block:
+
+         with PageFile( fname ) as pages:
+            Pt = pages[0]["OUTPUT FLOW"]["Pt"]
+   '''
+
+   __slots__ = ( 'fname', 'file', 'map', 'buffer', 'pages' )
+
+   def __init__( self, fname ):
+
+      self.fname = fname
+      self.pages = []
+      self.file = open( fname, 'rb' )
+      self.map = None
+      self.buffer = numpy.zeros( 0, dtype=numpy.uint8 )
+
+      size = self.file.seek( 0, 2 )
+      if size == 0:
+         return
+      self.map = mmap.mmap( self.file.fileno(), 0, access=mmap.ACCESS_READ )
+      self.buffer = numpy.frombuffer( self.map, dtype=numpy.uint8 )
+      self.index()
+
+   def __len__( self ):
+      return len(self.pages)
+
+   def __getitem__( self, page ):
+      return self.pages[ page ]
+
+   def __enter__( self ):
+      return self
+
+   def __exit__( self, *exception ):
+      self.close()
+
+   def setBuffer( self, buffer ):
+      '''points the file and every block at buffer'''
+
+      self.buffer = buffer
+      for page in self.pages:
+         for block in page.blocks.values():
+            block.buffer = buffer
+
+   def load( self ):
+      '''reads the whole file into memory and closes it; the pages stay
+         readable'''
+
+      if self.map is not None:
+         self.setBuffer( numpy.array( self.buffer ) )
+         self.map.close()
+         self.map = None
+      self.close()
+
+   def close( self ):
+      '''closes the memory map and the file'''
+
+      if self.map is not None:
+         # the map can only close once no array views it
+         self.setBuffer( None )
+         self.map.close()
+         self.map = None
+      self.file.close()
+
+   def index( self ):
+      '''finds the pages, blocks, and rows of the file'''
+
+      data = self.map
+      size = len(data)
+      page = None
+      block = None
+      titleLines = b""
+      previousBlank = True
+      pos = 0
+
+      while pos < size:
+         end = data.find( b"\n", pos )
+         if end < 0:
+            end = size
+         line = data[ pos:end ].rstrip( b"\r" )
+         blank = not line.strip()
+
+         if line.startswith( b"*****" ):
+            # new page, the next two lines are the title block
+            self.closeBlock( page, block )
+            page = Page( {} )
+            self.pages.append( page )
+            block = None
+            titleLines = b""
+            state = 2
+         elif page is None:
+            pass
+         elif state > 0:
+            titleLines += line + b"\n"
+            state -= 1
+            if state == 0:
+               page.title = self.parseTitle( titleLines )
+         elif blank:
+            self.closeBlock( page, block )
+            block = None
+         elif block is None and previousBlank:
+            block = { 'title': line.strip().decode(), 'heading': None, 'rows': [] }
+         elif block is not None and block['heading'] is None:
+            block['heading'] = line
+         elif block is not None:
+            block['rows'].append( ( pos, len(line), line ) )
+
+         previousBlank = blank
+         pos = end + 1
+
+      self.closeBlock( page, block )
+
+   def parseTitle( self, text ):
+      '''returns the case and solver values of a title block'''
+
+      title = {}
+      for key, ( pattern, convert ) in titlePatterns.items():
+         match = pattern.search( text )
+         if match is not None:
+            try:
+               title[key] = convert( match.group(1) )
+            except ValueError:
+               title[key] = match.group(1).decode()
+
+      return title
+
+   def closeBlock( self, page, block ):
+      '''adds a finished block to its page'''
+
+      if page is None or block is None or block['heading'] is None:
+         return
+
+      # each heading ends where its right aligned values end
+      headings = [ ( match.group().decode(), match.end() ) for match in headingPattern.finditer( block['heading'] ) ]
+      columns = [ name for name, end in headings ]
+      ends = [ end for name, end in headings ]
+
+      # the row labels fill the line up to the first value
+      names = []
+      components = []
+      labelEnd = ends[0]
+      for start, length, line in block['rows']:
+         label = line[ :ends[0] ].rstrip()
+         labelEnd = min( labelEnd, label.rfind( b" " ) + 1 )
+      for start, length, line in block['rows']:
+         label = line[ :labelEnd ].split()
+         names.append( label[0].decode() if label else "" )
+         components.append( label[-1].decode() if label else "" )
+
+      spans = list( zip( [ labelEnd ] + ends[:-1], ends ) )
+      page.blocks[ block['title'] ] = Block( block['title'], columns, spans, self.buffer,
+         [ row[0] for row in block['rows'] ], [ row[1] for row in block['rows'] ], names, components )
+
+
+
+
+def readPages( fname ):
+   '''reads a page viewer output file (viewOut or .out) written by OTACpage
+
+      returns a PageFile loaded into memory, with the file closed, so
+      sweeps over many files hold no descriptors or maps; its pages hold
+      the title block values (case, mode, converged, iterations, passes,
+      jacobians, broydens, ...) and the blocks of each page by title, e.g.
+
+         pages = readPages( "test_output/test_2stgCRturbine.viewOut" )
+         flow = pages[0]["OUTPUT FLOW"]
+         flow["Pt"]                          # Pt of every station
+         flow.value( "station1_0", "Tt" )    # Tt of one station
+         flow.table()                        # whole block as a structured array
+   '''
+
+   with PageFile( fname ) as pages:
+      pages.load()
+   return pages
@@ -0,0 +1,262 @@
+#
+# =============================================================================
+#          WARM START DATABASE OF CONVERGED SOLVER INDEPENDENTS
+#                      (GUESSES FOR NEW CASES FROM THE NEAREST CONVERGED
+#                       OPERATING POINTS)
+#
+# =============================================================================
+
+
+# python warmStart.py -d map.npz add test_output/test_2stgCRturbine.viewOut --Nmech 38000
+# python warmStart.py -d map.npz guess --Nmech 36000 --W 2.6 --PR 3.3 > guess.inc
+
+
+import argparse
+import os
+import re
+
+import numpy
+
+from viewOutReader import readPages
+
+c_DEGtoRAD = numpy.pi/180.
+
+keyNames = ( "Nmech", "W", "PR" )
+
+# BladeSegment independents: variable, page block, column, scale to model units
+segmentColumns = (
+   ( "alphaExit",      "BladeSegment Velocity Triangles", "Fl_OR.alpha*180./PI", c_DEGtoRAD ),
+   ( "MNexit",         "BladeSegment Velocity Triangles", "Fl_OR.MN",            1. ),
+   ( "radiusExit",     "BladeSegment Velocity Triangles", "Fl_OR.radius",        1. ),
+   ( "PR",             "BladeSegment Flow Conditions",    "PR",                  1. ),
+   ( "htExit",         "BladeSegment Flow Conditions",    "Fl_OR.ht",            1. ),
+   ( "incidenceGuess", "BladeSegment Geometry",           "incidence",           c_DEGtoRAD ),
+   ( "deviationGuess", "BladeSegment Geometry",           "deviation",           c_DEGtoRAD ),
+)
+
+# assembly independents by element class: variable, OUTPUT FLOW column of the
+# Fl_O station, scale to model units
+assemblyColumns = {
+   "OTACstart" : ( ( "MN", "MN", 1. ), ),
+   "Reducer"   : ( ( "alphaExit", "alpha", c_DEGtoRAD ), ( "MNexit", "MN", 1. ), ( "PtExit", "Pt", 1. ) ),
+}
+
+# per-stream assembly independents by element class: array variable, OUTPUT
+# FLOW column of the Fl_O1, Fl_O2, ... stations, scale to model units.  The
+# S_Avg.avgPt, avgAlpha and avgMN independents of TransitionSection1 are
+# commented out of TransitionSection1SL.int, so there are none to store
+streamColumns = {
+   "Expander"           : ( ( "MNexit", "MN", 1. ), ( "alphaExit", "alpha", c_DEGtoRAD ),
+                            ( "radiusExit", "radius", 1. ) ),
+   "TransitionSection1" : ( ( "alphaExit", "alpha", c_DEGtoRAD ), ( "radiusExit", "radius", 1. ),
+                            ( "MachExit", "MN", 1. ) ),
+}
+defaultAssemblies = { "start": "OTACstart", "expander": "Expander", "reducer": "Reducer" }
+
+
+
+
+def portRows( flow, element, streams=False ):
+   '''returns the OUTPUT FLOW rows of the Fl_O station of an element, or of
+      its Fl_O1, Fl_O2, ... stream stations in stream order
+
+      long component names are cut short and end in '>' on the page
+      (expander.Fl_O1 is printed expander.Fl_>), so stream stations are
+      matched by their position among the element's rows'''
+
+   port = element + ".Fl_O"
+   if not streams:
+      return numpy.flatnonzero( ( flow.components == port ) |
+                                ( ( flow.components == port[:12] + ">" ) & ( len(port) > 13 ) ) )
+
+   pattern = re.compile( re.escape( port ) + r"\d+$" )
+   return numpy.array( [ i for i, component in enumerate( flow.components )
+                         if pattern.match( component ) or
+                            ( len(component) == 13 and component.endswith( ">" ) and
+                              ( port + "1" ).startswith( component[:-1] ) ) ], dtype=int )
+
+
+
+
+def pageIndependents( page, assemblies=defaultAssemblies ):
+   '''returns the converged independents of a page as {variable path: value};
+      array independents of assemblies are stored per element, e.g.
+      expander.MNexit[0] for the hub stream
+
+      assemblies   {element name: class} of the OTACstart, Expander,
+                   TransitionSection1 and Reducer elements of the model
+   '''
+
+   values = {}
+   for variable, blockTitle, column, scale in segmentColumns:
+      if blockTitle not in page.blocks:
+         continue
+      block = page[blockTitle]
+      for name, value in zip( block.names, block[column] ):
+         values[ name + "." + variable ] = value*scale
+
+   flow = page["OUTPUT FLOW"]
+   for element, kind in assemblies.items():
+      if kind in streamColumns:
+         rows = portRows( flow, element, streams=True )
+         for variable, column, scale in streamColumns[kind]:
+            for n, value in enumerate( flow[column][rows] ):
+               values[ "%s.%s[%d]" % ( element, variable, n ) ] = value*scale
+         continue
+
+      rows = portRows( flow, element )
+      if len(rows) == 0:
+         continue
+      for variable, column, scale in assemblyColumns[kind]:
+         values[ element + "." + variable ] = flow[column][ rows[0] ]*scale
+
+   return values
+
+
+
+
+class WarmStartDatabase( object ):
+   '''converged independents of a model indexed by operating point
+
+      keys         operating point of each entry, one column per key name
+      variables    independent variable paths, e.g. rotor1.bladeSegment_2.MNexit
+      values       entries x variables, NaN where an entry lacks a variable
+   '''
+
+   __slots__ = ( 'keyNames', 'keys', 'variables', 'values' )
+
+   def __init__( self, keyNames=keyNames ):
+      self.keyNames = tuple( keyNames )
+      self.keys = numpy.zeros( ( 0, len(self.keyNames) ) )
+      self.variables = []
+      self.values = numpy.zeros( ( 0, 0 ) )
+
+   def __len__( self ):
+      return len(self.keys)
+
+   def add( self, point, values ):
+      '''adds the independents values {path: value} converged at point,
+         a sequence or {key name: value}'''
+
+      if isinstance( point, dict ):
+         point = [ point[name] for name in self.keyNames ]
+      point = numpy.asarray( point, dtype=float )
+      if point.shape != ( len(self.keyNames), ):
+         raise ValueError( "operating point needs %s" % ", ".join( self.keyNames ) )
+
+      new = [ name for name in sorted( values ) if name not in self.variables ]
+      if new:
+         self.variables.extend( new )
+         self.values = numpy.hstack( ( self.values, numpy.full( ( len(self), len(new) ), numpy.nan ) ) )
+
+      column = dict( ( name, i ) for i, name in enumerate( self.variables ) )
+      row = numpy.full( len(self.variables), numpy.nan )
+      row[ [ column[name] for name in values ] ] = list( values.values() )
+
+      self.keys = numpy.vstack( ( self.keys, point ) )
+      self.values = numpy.vstack( ( self.values, row ) )
+
+   def addPage( self, page, Nmech, W=None, PR=None, assemblies=defaultAssemblies ):
+      '''adds a converged viewOut page; W and PR default to the first station
+         flow and the first over last station Pt of the OUTPUT FLOW block.
+         Returns False, without adding it, for a page that did not converge'''
+
+      if not page.title.get( 'converged' ):
+         return False
+
+      flow = page["OUTPUT FLOW"]
+      if W is None:
+         W = flow["W"][0]
+      if PR is None:
+         PR = flow["Pt"][0]/flow["Pt"][-1]
+      self.add( { 'Nmech': Nmech, 'W': W, 'PR': PR }, pageIndependents( page, assemblies ) )
+      return True
+
+   def neighbours( self, point, count=4 ):
+      '''returns the entries nearest point and their distances, with each key
+         scaled by its spread over the database'''
+
+      if len(self) == 0:
+         raise ValueError( "warm start database is empty" )
+      if isinstance( point, dict ):
+         point = [ point[name] for name in self.keyNames ]
+
+      scale = numpy.ptp( self.keys, axis=0 )
+      scale[ scale == 0. ] = 1.
+      distance = numpy.sqrt( ( ( ( self.keys - numpy.asarray( point, dtype=float ) )/scale )**2 ).sum( axis=1 ) )
+      nearest = numpy.argsort( distance, kind='stable' )[:count]
+      return nearest, distance[nearest]
+
+   def guess( self, point, count=4, power=2. ):
+      '''returns {path: value} for point, the inverse distance weighted mean
+         of the count nearest entries having each variable; count=1 returns
+         the nearest entry'''
+
+      nearest, distance = self.neighbours( point, count )
+      if distance[0] == 0.:
+         nearest, weights = nearest[:1], numpy.ones( 1 )
+      else:
+         weights = distance**-power
+
+      values = self.values[nearest]
+      known = numpy.isfinite( values )
+      weight = ( weights[:,None]*known ).sum( axis=0 )
+      with numpy.errstate( invalid='ignore' ):
+         mean = ( weights[:,None]*numpy.where( known, values, 0. ) ).sum( axis=0 )/weight
+
+      return dict( ( name, value ) for name, value, found in zip( self.variables, mean, weight > 0. ) if found )
+
+   def guessBlock( self, point, count=4, power=2. ):
+      '''returns NPSS assignments of the guess for point, to go before run()'''
+
+      guess = self.guess( point, count, power )
+      return "".join( "%s = %.10g;\n" % ( name, guess[name] ) for name in sorted( guess ) )
+
+   def save( self, fname ):
+      numpy.savez( fname, keyNames=numpy.array( self.keyNames ), keys=self.keys,
+                   variables=numpy.array( self.variables, dtype=str ), values=self.values )
+
+
+
+
+def loadWarmStarts( fname ):
+   '''reads a database written by WarmStartDatabase.save'''
+
+   data = numpy.load( fname )
+   database = WarmStartDatabase( [ str( name ) for name in data['keyNames'] ] )
+   database.keys = data['keys']
+   database.variables = [ str( name ) for name in data['variables'] ]
+   database.values = data['values'].reshape( len(database.keys), len(database.variables) )
+   return database
+
+
+
+
+if __name__ == "__main__":
+
+   parser = argparse.ArgumentParser( description="warm start guesses from converged cases" )
+   parser.add_argument( "-d", "--database", required=True, help="database .npz file" )
+   parser.add_argument( "action", choices=( "add", "guess" ) )
+   parser.add_argument( "files", nargs="*", help="viewOut files to add" )
+   parser.add_argument( "--page", type=int, default=-1, help="page of each file to add, the last by default" )
+   parser.add_argument( "--Nmech", type=float, required=True, help="shaft speed, rpm" )
+   parser.add_argument( "--W", type=float, default=None, help="flow, from the page when adding" )
+   parser.add_argument( "--PR", type=float, default=None, help="pressure ratio, from the page when adding" )
+   parser.add_argument( "-n", "--neighbours", type=int, default=4, help="entries interpolated for a guess" )
+   args = parser.parse_args()
+
+   if os.path.exists( args.database ):
+      database = loadWarmStarts( args.database )
+   else:
+      database = WarmStartDatabase()
+
+   if args.action == "add":
+      for fname in args.files:
+         pages = readPages( fname )
+         if not database.addPage( pages[ args.page ], args.Nmech, args.W, args.PR ):
+            print( "%s did not converge, not added" % fname )
+      database.save( args.database )
+   else:
+      if args.W is None or args.PR is None:
+         parser.error( "guess needs --W and --PR" )
+      print( database.guessBlock( ( args.Nmech, args.W, args.PR ), args.neighbours ), end="" )